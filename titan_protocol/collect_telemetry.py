@@ -2,13 +2,20 @@
 """Collect telemetry for a run directory and write telemetry.json."""
 
 import argparse
+import calendar
 import datetime as dt
 import json
 import os
 import re
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+except ModuleNotFoundError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 
 KEY_MAP = {
     "tools_used": {"tool", "tool_name", "toolName"},
@@ -23,43 +30,137 @@ TOKEN_KEYS = [
     ("tokens_total", {"total_tokens"}),
 ]
 
+TOKEN_CONTAINERS = frozenset({"tokens", "usage", "token_usage"})
+
+# Inverted lookups so handler() only touches keys actually present in a node.
+KEY_TO_FIELD = {key: field for field, keys in KEY_MAP.items() for key in keys}
+TOKEN_KEY_TO_FIELD = {key: field for field, keys in TOKEN_KEYS for key in keys}
+
 SESSION_KEYS = ("sessionID", "session_id", "sessionId")
 PHASE_REGEX = re.compile(r"\bPHASE:\s*([A-Z][A-Z0-9_-]*)", re.IGNORECASE)
 PHASE_FIELDS = ("content", "text", "message", "input", "output", "prompt")
 
-LOG_TOKEN_PATTERNS = {
-    "tokens_prompt": [
-        re.compile(r"prompt[_\\s-]*tokens?\\s*[:=]\\s*(\\d+)", re.IGNORECASE),
-        re.compile(r"input[_\\s-]*tokens?\\s*[:=]\\s*(\\d+)", re.IGNORECASE),
-    ],
-    "tokens_completion": [
-        re.compile(r"completion[_\\s-]*tokens?\\s*[:=]\\s*(\\d+)", re.IGNORECASE),
-        re.compile(r"output[_\\s-]*tokens?\\s*[:=]\\s*(\\d+)", re.IGNORECASE),
-    ],
-    "tokens_total": [
-        re.compile(r"total[_\\s-]*tokens?\\s*[:=]\\s*(\\d+)", re.IGNORECASE),
-        re.compile(r"tokens?[_\\s-]*total\\s*[:=]\\s*(\\d+)", re.IGNORECASE),
-    ],
-}
+# One alternation per log scan; the named group that matched selects the bucket.
+# Log patterns are ASCII, so logs are scanned as bytes without a UTF-8 decode.
+LOG_TOKEN_PATTERN = re.compile(
+    rb"(?:prompt|input)[_\s-]*tokens?\s*[:=]\s*(?P<tokens_prompt>\d+)"
+    rb"|(?:completion|output)[_\s-]*tokens?\s*[:=]\s*(?P<tokens_completion>\d+)"
+    rb"|(?:total[_\s-]*tokens?|tokens?[_\s-]*total)\s*[:=]\s*(?P<tokens_total>\d+)",
+    re.IGNORECASE,
+)
+
+# Every token pattern contains one of these literals; windows without them skip
+# the regex engine entirely.
+LOG_TOKEN_HINTS = (b"token", b"prompt")
+
+# Logs are scanned in chunks; the overlap re-scans the tail of the previous chunk
+# so matches straddling a boundary are still seen (values are reduced with max).
+READ_CHUNK_SIZE = 65536
+LOG_CHUNK_OVERLAP = 256
 
 LOG_COMBINED_PATTERN = re.compile(
-    r"prompt\\s*[:=]\\s*(\\d+).*?completion\\s*[:=]\\s*(\\d+).*?total\\s*[:=]\\s*(\\d+)",
+    rb"prompt\s*[:=]\s*(\d+).*?completion\s*[:=]\s*(\d+).*?total\s*[:=]\s*(\d+)",
     re.IGNORECASE | re.DOTALL,
 )
 
 
 def walk(obj, handler):
-    if isinstance(obj, dict):
-        handler(obj)
-        for value in obj.values():
-            walk(value, handler)
-    elif isinstance(obj, list):
-        for value in obj:
-            walk(value, handler)
+    # Iterative pre-order traversal: deep exports must not hit the recursion limit.
+    stack = [obj]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        node = pop()
+        node_type = type(node)
+        if node_type is dict:
+            handler(node)
+            extend(reversed(node.values()))
+        elif node_type is list:
+            extend(reversed(node))
+
+
+def fast_iso_utc_to_ms(value: str):
+    # Fixed-layout "YYYY-MM-DDTHH:MM:SSZ" / "YYYY-MM-DDTHH:MM:SS.fffZ" only.
+    if (
+        value[4] != "-"
+        or value[7] != "-"
+        or value[10] != "T"
+        or value[13] != ":"
+        or value[16] != ":"
+    ):
+        return None
+    millis = "000"
+    if len(value) == 24:
+        if value[19] != ".":
+            return None
+        millis = value[20:23]
+    fields = (
+        value[0:4],
+        value[5:7],
+        value[8:10],
+        value[11:13],
+        value[14:16],
+        value[17:19],
+        millis,
+    )
+    if not all(field.isascii() and field.isdigit() for field in fields):
+        return None
+    year, month, day, hour, minute, second, ms = map(int, fields)
+    if not (
+        1 <= month <= 12
+        and 1 <= day <= calendar.monthrange(year, month)[1]
+        and hour < 24
+        and minute < 60
+        and second < 60
+    ):
+        return None
+    return calendar.timegm((year, month, day, hour, minute, second)) * 1000 + ms
 
 
-def parse_events(events):
-    collected = {
+@lru_cache(maxsize=4096)
+def parse_iso_timestamp(value: str):
+    # Bursts of events share timestamps, so repeated strings hit the cache.
+    if len(value) in (20, 24) and value[-1] == "Z":
+        ts = fast_iso_utc_to_ms(value)
+        if ts is not None:
+            return ts
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = dt.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return int(parsed.timestamp() * 1000)
+
+
+def parse_timestamp(value):
+    if value is None:
+        return None
+    if type(value) in (int, float):
+        ts = int(value)
+        if ts > 1_000_000_000_000:
+            return ts
+        if ts > 1_000_000_000:
+            return ts * 1000
+        return ts
+    if type(value) is str:
+        return parse_iso_timestamp(value)
+    return None
+
+
+def extract_timestamp(node):
+    if type(node) is not dict:
+        return None
+    for key in ("timestamp", "time", "created_at", "createdAt", "started_at"):
+        if key in node:
+            ts = parse_timestamp(node.get(key))
+            if ts is not None:
+                return ts
+    return None
+
+
+def init_collected():
+    return {
         "tools_used": set(),
         "models": set(),
         "subagents": set(),
@@ -71,39 +172,19 @@ def parse_events(events):
         "session_id": None,
         "variant": None,
         "phase_timeline": [],
+        "event_count": 0,
     }
 
-    def parse_timestamp(value):
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            ts = int(value)
-            if ts > 1_000_000_000_000:
-                return ts
-            if ts > 1_000_000_000:
-                return ts * 1000
-            return ts
-        if isinstance(value, str):
-            try:
-                parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
-                return int(parsed.timestamp() * 1000)
-            except ValueError:
-                return None
-        return None
 
-    def extract_timestamp(node):
-        if not isinstance(node, dict):
-            return None
-        for key in ("timestamp", "time", "created_at", "createdAt", "started_at"):
-            if key in node:
-                ts = parse_timestamp(node.get(key))
-                if ts is not None:
-                    return ts
-        return None
+def parse_events(events):
+    collected = init_collected()
+    # ids of token containers already summed by their parent node; the walk
+    # visits each one once more as a node of its own and must not re-add it.
+    counted_containers = set()
 
     def add_tokens(token_node):
-        if not isinstance(token_node, dict):
-            return
+        if type(token_node) is not dict:
+            return False
         prompt = token_node.get("prompt")
         if prompt is None:
             prompt = token_node.get("input")
@@ -121,12 +202,19 @@ def parse_events(events):
         total = token_node.get("total")
         if total is None:
             total = token_node.get("total_tokens")
-        if isinstance(prompt, int):
+        counted = False
+        if type(prompt) is int:
             collected["tokens_prompt"] += prompt
-        if isinstance(completion, int):
+            counted = True
+        if type(completion) is int:
             collected["tokens_completion"] += completion
-        if isinstance(total, int):
+            counted = True
+        if type(total) is int:
             collected["tokens_total"] += total
+            counted = True
+        if counted:
+            counted_containers.add(id(token_node))
+        return counted
 
     def add_model(node):
         if "model" in node:
@@ -146,55 +234,66 @@ def parse_events(events):
                 collected["models"].add(model_name)
             if variant and not collected["variant"]:
                 collected["variant"] = variant
-        if (
-            "variant" in node
-            and isinstance(node.get("variant"), str)
-            and not collected["variant"]
-        ):
+        if not collected["variant"] and type(node.get("variant")) is str:
             collected["variant"] = node["variant"]
 
     def add_phase_markers(node):
-        ts = extract_timestamp(node)
+        # One marker per node: fields of the same node share a timestamp, so
+        # extra markers would only add zero-length phases. Timestamps are only
+        # parsed for the rare nodes that carry a marker.
         for field in PHASE_FIELDS:
             value = node.get(field)
-            if isinstance(value, str):
+            if type(value) is str:
                 match = PHASE_REGEX.search(value)
-                if match and ts is not None:
-                    collected["phase_timeline"].append(
-                        {"phase": match.group(1).upper(), "timestamp_ms": ts}
-                    )
+                if not match:
+                    continue
+                ts = extract_timestamp(node)
+                if ts is not None:
+                    collected["phase_timeline"].append((match.group(1).upper(), ts))
+                return
 
     def handler(node):
-        if not collected["session_id"]:
+        keys = node.keys()
+        # Session ids are singletons: stop probing once one has been captured.
+        if not collected["session_id"] and not keys.isdisjoint(SESSION_KEYS):
             for key in SESSION_KEYS:
                 value = node.get(key)
-                if isinstance(value, str):
+                if type(value) is str:
                     collected["session_id"] = value
                     break
-        for field, keys in KEY_MAP.items():
-            for key in keys:
-                if key in node:
-                    value = node[key]
-                    if isinstance(value, str):
-                        collected[field].add(value)
-                    elif isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, str):
-                                collected[field].add(item)
+        for key in keys & KEY_TO_FIELD.keys():
+            value = node[key]
+            field = KEY_TO_FIELD[key]
+            if type(value) is str:
+                collected[field].add(value)
+            elif type(value) is list:
+                for item in value:
+                    if type(item) is str:
+                        collected[field].add(item)
         add_model(node)
         add_phase_markers(node)
-        if "tokens" in node:
-            add_tokens(node.get("tokens"))
-        if "usage" in node:
-            add_tokens(node.get("usage"))
-        if "token_usage" in node:
-            add_tokens(node.get("token_usage"))
-        for output_key, token_keys in TOKEN_KEYS:
-            for key in token_keys:
-                if key in node and isinstance(node[key], int):
-                    collected[output_key] += node[key]
-
-    walk(events, handler)
+        # Nested token containers take priority over flat *_tokens keys.
+        counted = id(node) in counted_containers
+        if counted:
+            counted_containers.discard(id(node))
+        for key in keys & TOKEN_CONTAINERS:
+            if add_tokens(node[key]):
+                counted = True
+        if counted:
+            return
+        for key in keys & TOKEN_KEY_TO_FIELD.keys():
+            value = node[key]
+            if type(value) is int:
+                collected[TOKEN_KEY_TO_FIELD[key]] += value
+
+    if isinstance(events, (dict, list)):
+        collected["event_count"] = len(events)
+        walk(events, handler)
+    else:
+        # Streamed events are walked one at a time and never retained.
+        for event in events:
+            collected["event_count"] += 1
+            walk(event, handler)
     if (
         collected["tokens_total"] == 0
         and collected["tokens_prompt"]
@@ -207,9 +306,9 @@ def parse_events(events):
 
 
 def parse_model_value(model_value):
-    if isinstance(model_value, str):
+    if type(model_value) is str:
         return model_value, None
-    if isinstance(model_value, dict):
+    if type(model_value) is dict:
         provider = (
             model_value.get("providerID")
             or model_value.get("provider")
@@ -228,22 +327,46 @@ def parse_model_value(model_value):
     return None, None
 
 
-def load_events_from_jsonl(path: Path):
-    events = []
-    with path.open(encoding="utf-8") as f:
+def loads_json(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def iter_events_from_jsonl(path: Path):
+    with path.open("rb", buffering=READ_CHUNK_SIZE) as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
             try:
-                events.append(json.loads(line))
+                yield loads_json(line)
             except json.JSONDecodeError:
                 continue
-    return events
+
+
+def load_events_from_jsonl(path: Path):
+    return list(iter_events_from_jsonl(path))
 
 
 def load_events_from_json(path: Path):
-    return json.loads(path.read_text(encoding="utf-8"))
+    return loads_json(path.read_bytes())
+
+
+def write_file_bytes(path: Path, data: bytes) -> None:
+    # Unbuffered write of already-encoded bytes; no fsync, this is scratch output.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
 
 
 def load_phase_log(path: Path):
@@ -255,45 +378,44 @@ def load_phase_log(path: Path):
         if len(parts) != 2:
             continue
         ts_raw, phase_raw = parts
-        ts = None
         try:
             ts = int(ts_raw)
         except ValueError:
-            try:
-                parsed = dt.datetime.fromisoformat(ts_raw.replace("Z", "+00:00"))
-                ts = int(parsed.timestamp() * 1000)
-            except ValueError:
-                ts = None
+            ts = parse_iso_timestamp(ts_raw)
         if ts is None:
             continue
-        timeline.append({"phase": phase_raw.upper(), "timestamp_ms": ts})
+        timeline.append((phase_raw.upper(), ts))
     return timeline
 
 
+def timeline_to_json(timeline):
+    # Timelines are kept as (phase, timestamp_ms) tuples until serialization.
+    return [{"phase": phase, "timestamp_ms": ts} for phase, ts in timeline]
+
+
 def compute_phase_durations(timeline):
     if not timeline:
         return {}, None
-    timeline = sorted(timeline, key=lambda x: x["timestamp_ms"])
+    timestamps = [ts for _, ts in timeline]
+    order = sorted(range(len(timeline)), key=timestamps.__getitem__)
+    sorted_ts = [timestamps[idx] for idx in order]
     durations = {}
-    for idx, entry in enumerate(timeline):
-        phase = entry["phase"]
-        start = entry["timestamp_ms"]
-        end = timeline[idx + 1]["timestamp_ms"] if idx + 1 < len(timeline) else None
-        if end is not None:
-            durations[phase] = end - start
-    total = timeline[-1]["timestamp_ms"] - timeline[0]["timestamp_ms"]
+    for idx, start, end in zip(order, sorted_ts, sorted_ts[1:]):
+        durations[timeline[idx][0]] = end - start
+    total = sorted_ts[-1] - sorted_ts[0]
     return durations, total
 
 
-def parse_tokens_from_text(text: str) -> dict:
+def parse_tokens_from_text(text: str | bytes) -> dict:
+    if isinstance(text, str):
+        text = text.encode("utf-8", errors="ignore")
     values = {"tokens_prompt": [], "tokens_completion": [], "tokens_total": []}
-    for key, patterns in LOG_TOKEN_PATTERNS.items():
-        for pattern in patterns:
-            for match in pattern.findall(text):
-                try:
-                    values[key].append(int(match))
-                except (TypeError, ValueError):
-                    continue
+    lowered = text.lower()
+    if not any(hint in lowered for hint in LOG_TOKEN_HINTS):
+        return {key: None for key in values}
+    for match in LOG_TOKEN_PATTERN.finditer(text):
+        key = match.lastgroup
+        values[key].append(int(match.group(key)))
     for match in LOG_COMBINED_PATTERN.findall(text):
         try:
             prompt, completion, total = (int(match[0]), int(match[1]), int(match[2]))
@@ -308,34 +430,48 @@ def parse_tokens_from_text(text: str) -> dict:
     return parsed
 
 
+def iter_log_windows(path: Path):
+    with path.open("rb") as f:
+        tail = b""
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            window = tail + chunk
+            yield window
+            tail = window[-LOG_CHUNK_OVERLAP:]
+
+
 def parse_tokens_from_logs(paths) -> dict:
     combined = {"tokens_prompt": None, "tokens_completion": None, "tokens_total": None}
     for path in paths:
         try:
-            text = Path(path).read_text(encoding="utf-8", errors="ignore")
+            for window in iter_log_windows(Path(path)):
+                parsed = parse_tokens_from_text(window)
+                for key, value in parsed.items():
+                    if value is None:
+                        continue
+                    if combined[key] is None or value > combined[key]:
+                        combined[key] = value
         except FileNotFoundError:
             continue
-        parsed = parse_tokens_from_text(text)
-        for key, value in parsed.items():
-            if value is None:
-                continue
-            if combined[key] is None or value > combined[key]:
-                combined[key] = value
     return combined
 
 
 def export_opencode(session_id: str, out_path: Path):
     opencode_bin = os.getenv("OPENCODE_BIN", "opencode")
-    result = subprocess.run(
-        [opencode_bin, "export", session_id],
-        capture_output=True,
-        text=True,
-    )
+    # Stream the export straight to disk instead of buffering it in memory.
+    with out_path.open("wb") as f:
+        result = subprocess.run(
+            [opencode_bin, "export", session_id],
+            stdout=f,
+            stderr=subprocess.PIPE,
+        )
     if result.returncode != 0:
-        print(result.stdout)
-        print(result.stderr)
+        print(out_path.read_text(encoding="utf-8", errors="replace"))
+        print(result.stderr.decode("utf-8", errors="replace"))
+        out_path.unlink()
         raise SystemExit("opencode export failed")
-    out_path.write_text(result.stdout, encoding="utf-8")
 
 
 def main():
@@ -375,37 +511,25 @@ def main():
     elif args.events:
         events_path = Path(args.events).resolve()
         raw_export_path = events_path
-        events = load_events_from_jsonl(events_path)
+        events = iter_events_from_jsonl(events_path)
     else:
         for candidate in (run_dir / "events.jsonl", run_dir / "opencode_events.jsonl"):
             if candidate.exists():
                 raw_export_path = candidate
-                events = load_events_from_jsonl(candidate)
+                events = iter_events_from_jsonl(candidate)
                 break
 
     phase_timeline = []
     if args.phase_log:
         phase_timeline = load_phase_log(Path(args.phase_log).resolve())
 
-    collected = parse_events(events) if events else {
-        "tools_used": set(),
-        "models": set(),
-        "subagents": set(),
-        "skills_used": set(),
-        "slash_commands": set(),
-        "tokens_prompt": None,
-        "tokens_completion": None,
-        "tokens_total": None,
-        "session_id": None,
-        "variant": None,
-        "phase_timeline": [],
-    }
+    collected = parse_events(events) if events else init_collected()
 
     if collected.get("phase_timeline"):
         phase_timeline.extend(collected["phase_timeline"])
     phase_durations, duration_ms = compute_phase_durations(phase_timeline)
 
-    models = sorted(collected.get("models", []))
+    models = sorted(collected["models"])
 
     log_tokens = {}
     if args.logs:
@@ -426,22 +550,19 @@ def main():
         "tokens_prompt": collected.get("tokens_prompt") or None,
         "tokens_completion": collected.get("tokens_completion") or None,
         "tokens_total": collected.get("tokens_total") or None,
-        "tools_used": sorted(collected.get("tools_used", [])),
-        "subagents": sorted(collected.get("subagents", [])),
-        "skills_used": sorted(collected.get("skills_used", [])),
-        "slash_commands": sorted(collected.get("slash_commands", [])),
+        "tools_used": sorted(collected["tools_used"]),
+        "subagents": sorted(collected["subagents"]),
+        "skills_used": sorted(collected["skills_used"]),
+        "slash_commands": sorted(collected["slash_commands"]),
         "models": models,
-        "event_count": len(events) if events else None,
+        "event_count": collected.get("event_count") or None,
         "raw_events": str(raw_export_path) if raw_export_path else None,
-        "phase_timeline": phase_timeline or None,
+        "phase_timeline": timeline_to_json(phase_timeline) or None,
         "phase_durations_ms": phase_durations or None,
         "duration_ms": duration_ms,
     }
 
-    (run_dir / "telemetry.json").write_text(
-        json.dumps(telemetry, indent=2),
-        encoding="utf-8",
-    )
+    write_file_bytes(run_dir / "telemetry.json", dumps_json(telemetry))
     print(f"Wrote telemetry to {run_dir / 'telemetry.json'}")
 
 
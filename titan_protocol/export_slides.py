@@ -2,65 +2,371 @@
 """Export presentation.md to PPTX for Google Slides import."""
 
 import argparse
+import importlib
+import importlib.util
+import io
+import os
 import re
 import subprocess
 import sys
+import zipfile
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+# --fast writes slide parts straight into the zip of python-pptx's default
+# template, skipping its per-slide part, relationship and proxy bookkeeping. The
+# templates below mirror what add_slide() emits for the two layouts used here.
+XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+REL_TYPE_BASE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+SLIDE_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+)
+SLIDE_TEMPLATE = (
+    XML_DECLARATION
+    + '<p:sld xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+    ' xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+    f' xmlns:r="{REL_TYPE_BASE}"><p:cSld><p:spTree><p:nvGrpSpPr>'
+    '<p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+    "{shapes}</p:spTree></p:cSld>"
+    "<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>"
+)
+PLACEHOLDER_TEMPLATE = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="{name}"/><p:cNvSpPr>'
+    '<a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr>{ph}</p:nvPr></p:nvSpPr><p:spPr/>'
+    "<p:txBody><a:bodyPr/><a:lstStyle/>{paragraphs}</p:txBody></p:sp>"
+)
+PICTURE_TEMPLATE = (
+    '<p:pic><p:nvPicPr><p:cNvPr id="{shape_id}" name="Picture {index}"'
+    ' descr={descr}/><p:cNvPicPr><a:picLocks noChangeAspect="1"/></p:cNvPicPr>'
+    '<p:nvPr/></p:nvPicPr><p:blipFill><a:blip r:embed="{rid}"/><a:stretch>'
+    "<a:fillRect/></a:stretch></p:blipFill><p:spPr><a:xfrm>"
+    '<a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+)
+RELS_TEMPLATE = (
+    XML_DECLARATION
+    + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">{rels}</Relationships>'
+)
+REL_TEMPLATE = (
+    '<Relationship Id="{rid}" Type="' + REL_TYPE_BASE + '/{kind}" Target="{target}"/>'
+)
+# python-pptx writes control characters as _xHHHH_ (saxutils.escape leaves
+# them raw, which is not well-formed XML) and turns \n and \v into <a:br/>.
+CONTROL_CHAR_RE = re.compile(r"[\x00-\x08\x0B-\x1F]")
+LINE_BREAK_RE = re.compile("\n|\v")
+EMU_PER_INCH = 914400
+IMAGE_LEFT, IMAGE_TOP, IMAGE_WIDTH = 914400, 1371600, 7315200
 
 
 def ensure_package(import_name: str, package: str, allow_install: bool) -> bool:
-    try:
-        __import__(import_name)
+    # find_spec only locates the package; it does not execute its __init__.
+    if importlib.util.find_spec(import_name) is not None:
         return True
-    except ImportError:
-        if not allow_install:
-            return False
-        print(f"Missing dependency: {package}. Attempting install...")
-        result = subprocess.run(
-            [sys.executable, "-m", "pip", "install", package],
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode != 0:
-            print(result.stdout)
-            print(result.stderr)
-            return False
-        try:
-            __import__(import_name)
-            return True
-        except ImportError:
-            return False
+    if not allow_install:
+        return False
+    print(f"Missing dependency: {package}. Attempting install...")
+    result = subprocess.run(
+        [sys.executable, "-m", "pip", "install", package],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        return False
+    importlib.invalidate_caches()
+    return importlib.util.find_spec(import_name) is not None
 
 
 def parse_slides(markdown: str):
-    sections = [s.strip() for s in markdown.split("---") if s.strip()]
+    # Returns one (title, bullets, images) tuple per slide.
+    # Single pass: only a standalone "---" line separates slides, so table rules
+    # or inline dashes no longer split a slide.
     slides = []
-    for section in sections:
-        title = None
-        bullets = []
-        images = []
-        for line in section.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith("#"):
-                if title is None:
-                    title = line.lstrip("#").strip()
-                else:
-                    bullets.append(line.lstrip("#").strip())
-                continue
-            match = re.match(r"[-*]\s+(.*)", line)
-            if match:
-                bullets.append(match.group(1))
-                continue
-            img_match = re.match(r"!\[[^\]]*\]\(([^)]+)\)", line)
-            if img_match:
-                images.append(img_match.group(1))
-                continue
-        slides.append({"title": title, "bullets": bullets, "images": images})
+    title = None
+    bullets = []
+    images = []
+    has_content = False
+    for line in markdown.splitlines():
+        line = line.strip()
+        if line == "---":
+            if has_content:
+                slides.append((title or "", bullets, images))
+            title = None
+            bullets = []
+            images = []
+            has_content = False
+            continue
+        if not line:
+            continue
+        has_content = True
+        first = line[:1]
+        if first == "#":
+            heading = line.lstrip("#").strip()
+            if title is None:
+                title = heading
+            else:
+                bullets.append(heading)
+        elif first in ("-", "*"):
+            if line[1:2].isspace():
+                bullets.append(line[2:].lstrip())
+        elif first == "!":
+            # ![alt](path): alt has no "]" and path is non-empty without ")".
+            head, sep, rest = line.partition("](")
+            if sep and head[1:2] == "[" and "]" not in head:
+                path, sep, _ = rest.partition(")")
+                if sep and path:
+                    images.append(path)
+    if has_content:
+        slides.append((title or "", bullets, images))
     return slides
 
 
+def resolve_image(image_path: str, search_dirs):
+    for directory in search_dirs:
+        candidate = directory / image_path
+        if candidate.exists():
+            return str(candidate.resolve())
+    return None
+
+
+def write_pptx(slides, resolved_images, out_path: Path) -> None:
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    image_left, image_top, image_width = Inches(1), Inches(1.5), Inches(8)
+
+    prs = Presentation()
+    title_layout = prs.slide_layouts[0]
+    content_layout = prs.slide_layouts[1]
+    sld_id_lst = prs.slides._sldIdLst
+    placeholder_prototypes = {}
+
+    def add_slide(title, images, layout):
+        # Same steps as prs.slides.add_slide(), except the layout placeholders
+        # are cloned once per layout and deep-copied onto later slides.
+        rId, slide = prs.part.add_slide(layout)
+        prototype = placeholder_prototypes.get(layout.part)
+        if prototype is None:
+            slide.shapes.clone_layout_placeholders(layout)
+            placeholder_prototypes[layout.part] = [
+                deepcopy(element) for element in slide.shapes._spTree.iter_shape_elms()
+            ]
+        else:
+            sp_tree = slide.shapes._spTree
+            for element in prototype:
+                sp_tree.append(deepcopy(element))
+        sld_id_lst.add_sldId(rId)
+
+        # shapes.title re-walks the slide XML on every access.
+        title_shape = slide.shapes.title
+        if title_shape:
+            title_shape.text = title
+
+        for image_path in images:
+            image_file = resolved_images[image_path]
+            if image_file is not None:
+                slide.shapes.add_picture(
+                    image_file, image_left, image_top, width=image_width
+                )
+        return slide
+
+    # Only the first slide uses the title layout, so it is handled up front and
+    # the loop below always works with the content layout.
+    if slides:
+        title, _, images = slides[0]
+        add_slide(title, images, title_layout)
+
+    for title, bullets, images in slides[1:]:
+        slide = add_slide(title, images, content_layout)
+        if not slide.placeholders:
+            continue
+        # A freshly added placeholder already holds a single empty <a:p/>, so
+        # there is nothing to clear. Paragraphs are appended through the oxml
+        # layer; add_paragraph builds a proxy and re-locates the last paragraph
+        # for every bullet. append_text is what paragraph.text uses, so control
+        # characters still get python-pptx's _xHHHH_ escaping.
+        tx_body = slide.placeholders[1].text_frame._txBody
+        for bullet in bullets:
+            tx_body.add_p().append_text(bullet)
+
+    # python-pptx writes many small ZIP records; a 1 MiB buffer batches them.
+    with open(out_path, "wb", buffering=1 << 20) as handle:
+        prs.save(handle)
+
+
+def escape_control_char(match) -> str:
+    return f"_x{ord(match.group()):04X}_"
+
+
+def paragraph_xml(text: str) -> str:
+    # Mirrors CT_TextParagraph.append_text: runs split on line breaks, with
+    # empty runs dropped.
+    parts = []
+    for idx, run in enumerate(LINE_BREAK_RE.split(text)):
+        if idx:
+            parts.append("<a:br/>")
+        if run:
+            run = escape(CONTROL_CHAR_RE.sub(escape_control_char, run))
+            parts.append(f"<a:r><a:t>{run}</a:t></a:r>")
+    if not parts:
+        return "<a:p/>"
+    return "<a:p>" + "".join(parts) + "</a:p>"
+
+
+def write_pptx_fast(slides, resolved_images, out_path: Path) -> None:
+    from pptx import Presentation
+    from pptx.parts.image import Image
+
+    skeleton = io.BytesIO()
+    Presentation().save(skeleton)
+
+    parts = []
+    media = {}
+    image_types = {}
+    for number, (title, bullets, images) in enumerate(slides, start=1):
+        if number == 1:
+            layout = "slideLayout1.xml"
+            shapes = [
+                PLACEHOLDER_TEMPLATE.format(
+                    shape_id=2,
+                    name="Title 1",
+                    ph='<p:ph type="ctrTitle"/>',
+                    paragraphs=paragraph_xml(title),
+                ),
+                PLACEHOLDER_TEMPLATE.format(
+                    shape_id=3,
+                    name="Subtitle 2",
+                    ph='<p:ph type="subTitle" idx="1"/>',
+                    paragraphs="<a:p/>",
+                ),
+            ]
+        else:
+            layout = "slideLayout2.xml"
+            shapes = [
+                PLACEHOLDER_TEMPLATE.format(
+                    shape_id=2,
+                    name="Title 1",
+                    ph='<p:ph type="title"/>',
+                    paragraphs=paragraph_xml(title),
+                ),
+                PLACEHOLDER_TEMPLATE.format(
+                    shape_id=3,
+                    name="Content Placeholder 2",
+                    ph='<p:ph idx="1"/>',
+                    paragraphs="<a:p/>" + "".join(map(paragraph_xml, bullets)),
+                ),
+            ]
+        rels = [
+            REL_TEMPLATE.format(
+                rid="rId1", kind="slideLayout", target=f"../slideLayouts/{layout}"
+            )
+        ]
+        embeds = {}
+        for image_path in images:
+            image_file = resolved_images[image_path]
+            if image_file is None:
+                continue
+            if image_file not in media:
+                image = Image.from_file(image_file)
+                partname = f"ppt/media/image{len(media) + 1}.{image.ext}"
+                # Same aspect-preserving scale as ImagePart.scale() for width only.
+                width_px, height_px = image.size
+                horz_dpi, vert_dpi = image.dpi
+                native_cx = int(EMU_PER_INCH * width_px / horz_dpi)
+                native_cy = int(EMU_PER_INCH * height_px / vert_dpi)
+                height = int(round(native_cy * (IMAGE_WIDTH / native_cx)))
+                media[image_file] = (partname, height, image.filename)
+                image_types.setdefault(image.ext, image.content_type)
+                parts.append((partname, image.blob))
+            partname, height, filename = media[image_file]
+            rid = embeds.get(partname)
+            if rid is None:
+                rid = embeds[partname] = f"rId{len(rels) + 1}"
+                rels.append(
+                    REL_TEMPLATE.format(
+                        rid=rid, kind="image", target="../" + partname[4:]
+                    )
+                )
+            shape_id = len(shapes) + 2
+            shapes.append(
+                PICTURE_TEMPLATE.format(
+                    shape_id=shape_id,
+                    index=shape_id - 1,
+                    descr=quoteattr(filename),
+                    rid=rid,
+                    left=IMAGE_LEFT,
+                    top=IMAGE_TOP,
+                    width=IMAGE_WIDTH,
+                    height=height,
+                )
+            )
+        parts.append(
+            (
+                f"ppt/slides/slide{number}.xml",
+                SLIDE_TEMPLATE.format(shapes="".join(shapes)).encode("utf-8"),
+            )
+        )
+        parts.append(
+            (
+                f"ppt/slides/_rels/slide{number}.xml.rels",
+                RELS_TEMPLATE.format(rels="".join(rels)).encode("utf-8"),
+            )
+        )
+
+    slide_numbers = range(1, len(slides) + 1)
+    with (
+        zipfile.ZipFile(skeleton) as template,
+        open(out_path, "wb", buffering=1 << 20) as handle,
+        zipfile.ZipFile(handle, "w", zipfile.ZIP_DEFLATED) as package,
+    ):
+        presentation_rels = template.read("ppt/_rels/presentation.xml.rels")
+        first_rid = presentation_rels.count(b"<Relationship ")
+        for item in template.infolist():
+            data = template.read(item)
+            if item.filename == "[Content_Types].xml":
+                types = [
+                    f'<Default Extension="{ext}" ContentType="{content_type}"/>'
+                    for ext, content_type in image_types.items()
+                    if f'Extension="{ext}"'.encode() not in data
+                ]
+                types += [
+                    f'<Override PartName="/ppt/slides/slide{number}.xml"'
+                    f' ContentType="{SLIDE_CONTENT_TYPE}"/>'
+                    for number in slide_numbers
+                ]
+                data = data.replace(b"</Types>", "".join(types).encode() + b"</Types>")
+            elif item.filename == "ppt/_rels/presentation.xml.rels":
+                rels = "".join(
+                    REL_TEMPLATE.format(
+                        rid=f"rId{first_rid + number}",
+                        kind="slide",
+                        target=f"slides/slide{number}.xml",
+                    )
+                    for number in slide_numbers
+                )
+                data = data.replace(
+                    b"</Relationships>", rels.encode() + b"</Relationships>"
+                )
+            elif item.filename == "ppt/presentation.xml" and slides:
+                slide_ids = "".join(
+                    f'<p:sldId id="{255 + number}" r:id="rId{first_rid + number}"/>'
+                    for number in slide_numbers
+                )
+                data = data.replace(
+                    b"<p:sldSz",
+                    f"<p:sldIdLst>{slide_ids}</p:sldIdLst><p:sldSz".encode(),
+                    1,
+                )
+            package.writestr(item, data)
+        for name, data in parts:
+            package.writestr(name, data)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Export presentation.md to PPTX.")
     parser.add_argument(
@@ -78,55 +384,47 @@ def main():
         action="store_true",
         help="Disable auto-install of python-pptx.",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Write slide XML straight into the PPTX zip (large decks).",
+    )
     args = parser.parse_args()
 
     if not ensure_package("pptx", "python-pptx", not args.no_install):
         raise SystemExit("python-pptx is required")
 
-    from pptx import Presentation
-    from pptx.util import Inches
-
     base_dir = Path(__file__).resolve().parent
     input_path = base_dir / args.input
     out_path = base_dir / args.out
+    try:
+        input_size = os.stat(input_path).st_size
+    except FileNotFoundError:
+        raise SystemExit(f"Missing input file: {input_path}") from None
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    markdown = input_path.read_text(encoding="utf-8")
+    # Read into a buffer sized from stat: one allocation, one read.
+    buf = bytearray(input_size)
+    with open(input_path, "rb") as handle:
+        del buf[handle.readinto(buf) :]
+    markdown = buf.decode("utf-8")
     slides = parse_slides(markdown)
 
-    prs = Presentation()
-    title_layout = prs.slide_layouts[0]
-    content_layout = prs.slide_layouts[1]
-
-    for idx, slide_data in enumerate(slides):
-        layout = title_layout if idx == 0 else content_layout
-        slide = prs.slides.add_slide(layout)
-
-        title = slide_data.get("title") or ""
-        if slide.shapes.title:
-            slide.shapes.title.text = title
-
-        if layout == content_layout and slide.placeholders:
-            body = slide.placeholders[1].text_frame
-            body.clear()
-            for bullet in slide_data.get("bullets", []):
-                p = body.add_paragraph()
-                p.text = bullet
-                p.level = 0
-
-        for image_path in slide_data.get("images", []):
-            image_file = (base_dir / image_path).resolve()
-            if not image_file.exists():
-                image_file = (base_dir / "artifacts" / image_path).resolve()
-            if image_file.exists():
-                slide.shapes.add_picture(
-                    str(image_file),
-                    Inches(1),
-                    Inches(1.5),
-                    width=Inches(8),
-                )
+    # Images are looked up relative to the script dir, then artifacts/. Each
+    # distinct path is resolved once, on a thread pool so slow (network) stat
+    # calls overlap instead of running back to back.
+    search_dirs = (base_dir, base_dir / "artifacts")
+    image_paths = list(dict.fromkeys(img for _, _, imgs in slides for img in imgs))
+    resolved_images = {}
+    if image_paths:
+        with ThreadPoolExecutor(max_workers=min(16, len(image_paths))) as pool:
+            results = pool.map(resolve_image, image_paths, repeat(search_dirs))
+            resolved_images = dict(zip(image_paths, results))
 
-    prs.save(out_path)
+    if args.fast:
+        write_pptx_fast(slides, resolved_images, out_path)
+    else:
+        write_pptx(slides, resolved_images, out_path)
     print(f"Wrote slides to {out_path}")
 
 
@@ -3,13 +3,26 @@
 from __future__ import annotations
 
 import ast
+import io
 import json
+import mmap
 import os
+import re
 import shutil
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
+
+try:
+    import orjson
+except ModuleNotFoundError:  # optional speedup; stdlib json is the fallback
+    orjson = None
 
 TRUTHY = {"1", "true", "TRUE", "yes", "YES"}
 QUALITY_CHECKS = {
@@ -34,59 +47,223 @@ COVERAGE_MIN = 80.0
 VULTURE_MIN_CONFIDENCE = 80
 QUALITY_TIMEOUT = 60
 EXEC_TIMEOUT = 20
-SKIP_DIRS = {
-    ".venv",
-    "__pycache__",
-    ".pytest_cache",
-    ".ruff_cache",
-    ".mypy_cache",
-    ".pyright",
-    ".jscpd-report",
-}
+EXEC_OUTPUT_TAIL = 4000
+KEYWORD_READ_SIZE = 8192
+# Whitespace-separated tokens of one line, up to the first one ending in "%".
+COVERAGE_TOKEN_RE = re.compile(r"[^\S\n]*(?:\S+[^\S\n]+)*?(\S*%)(?=\s|$)", re.MULTILINE)
+SKIP_DIRS = frozenset(
+    {
+        ".venv",
+        "__pycache__",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".mypy_cache",
+        ".pyright",
+        ".jscpd-report",
+    }
+)
 
 
-def read_text(filepath: Path) -> str:
-    """Return UTF-8 text content or empty string if unreadable."""
+def file_key(filepath: Path) -> Optional[tuple[str, int, int]]:
+    """Return a (path, mtime_ns, size) cache key, or None if the file is missing."""
     try:
-        return filepath.read_text(encoding="utf-8")
+        stat = filepath.stat()
+    except FileNotFoundError:
+        return None
+    return str(filepath), stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=1024)
+def _read_text_cached(path: str, mtime_ns: int, size: int) -> str:
+    """Read a file once per (path, mtime_ns, size) key."""
+    try:
+        return Path(path).read_text(encoding="utf-8")
     except (UnicodeDecodeError, FileNotFoundError, IsADirectoryError):
         return ""
 
 
+def read_text(filepath: Path) -> str:
+    """Return UTF-8 text content or empty string if unreadable."""
+    key = file_key(filepath)
+    if key is None:
+        return ""
+    return _read_text_cached(*key)
+
+
+def loads_json(data: bytes):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json(obj, path: Path) -> None:
+    """Write indented JSON to a file, using orjson when it is installed."""
+    with path.open("wb") as handle:
+        if orjson is not None:
+            handle.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+            return
+        with io.TextIOWrapper(handle, encoding="utf-8") as text:
+            json.dump(obj, text, indent=2)
+
+
+@lru_cache(maxsize=32)
+def keyword_regex(keywords: tuple[str, ...]) -> re.Pattern[bytes]:
+    """Compile keywords into one literal bytes alternation, cached per keyword set."""
+    return re.compile(b"|".join(re.escape(k.encode("utf-8")) for k in keywords))
+
+
+def search_chunks(handle, pattern: re.Pattern[bytes], overlap: int) -> bool:
+    """Search a binary stream in chunks, stopping at the first match.
+
+    The last ``overlap`` bytes of each chunk are carried into the next one so a
+    keyword split across a chunk boundary is still found.
+    """
+    carry = b""
+    while chunk := handle.read(KEYWORD_READ_SIZE):
+        buffer = carry + chunk
+        if pattern.search(buffer):
+            return True
+        carry = buffer[max(len(buffer) - overlap, 0) :]
+    return False
+
+
 def check_file_content(filepath: Path, keywords: list[str]) -> bool:
-    """Return True if any keyword appears in the file content."""
-    content = read_text(filepath)
-    if not content:
+    """Return True if any keyword appears in the file content.
+
+    The file is searched through a read-only mmap, so it is never decoded and
+    the scan stops at the first hit. Filesystems that cannot mmap are read in
+    chunks instead.
+    """
+    pattern = keyword_regex(tuple(keywords))
+    try:
+        with filepath.open("rb") as handle:
+            # mmap rejects empty files, which cannot contain a keyword anyway.
+            if os.fstat(handle.fileno()).st_size == 0:
+                return False
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except OSError:
+                overlap = max(len(k.encode("utf-8")) for k in keywords) - 1
+                return search_chunks(handle, pattern, overlap)
+            with mapped:
+                return pattern.search(mapped) is not None
+    except (FileNotFoundError, IsADirectoryError):
         return False
-    return any(k in content for k in keywords)
 
 
-def parse_python(filepath: Path) -> Optional[ast.AST]:
-    """Parse a Python file into an AST or return None on failure."""
-    content = read_text(filepath)
-    if not content:
-        return None
+def parse_source(content: str) -> Optional[ast.AST]:
+    """Parse Python source into an AST or return None on syntax errors."""
     try:
         return ast.parse(content)
     except SyntaxError:
         return None
 
 
-def dotted_name(node: ast.AST) -> Optional[str]:
-    """Return a dotted name for Name/Attribute nodes."""
-    if isinstance(node, ast.Name):
-        return node.id
+def parse_python(filepath: Path) -> Optional[ast.AST]:
+    """Parse a Python file into an AST or return None on failure.
+
+    Trees are memoized in-process per (path, mtime_ns, size), so the checks
+    that share a file parse it once.
+    """
+    key = file_key(filepath)
+    if key is None:
+        return None
+    return _parse_python_cached(*key)
+
+
+def clear_parse_caches() -> None:
+    """Drop in-process file text and AST memoization."""
+    _read_text_cached.cache_clear()
+    _parse_python_cached.cache_clear()
+
+
+@lru_cache(maxsize=1024)
+def _parse_python_cached(path: str, mtime_ns: int, size: int) -> Optional[ast.AST]:
+    """Parse a file once per (path, mtime_ns, size) key."""
+    content = _read_text_cached(path, mtime_ns, size)
+    if not content:
+        return None
+    return parse_source(content)
+
+
+def call_suffix(node: ast.AST) -> Optional[str]:
+    """Return the last component of a Name/Attribute node.
+
+    Suffix checks such as endswith("rotate") only depend on this component,
+    so the full dotted name never needs to be built.
+    """
     if isinstance(node, ast.Attribute):
-        base = dotted_name(node.value)
-        if base:
-            return f"{base}.{node.attr}"
         return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
     return None
 
 
-def is_constant_45(node: ast.AST) -> bool:
-    """Return True if node is literal 45."""
-    return isinstance(node, ast.Constant) and node.value == 45
+def is_patch_call(func: ast.AST, suffix: str) -> bool:
+    """Return True for *patch(...) and *patch.object(...) call targets."""
+    if suffix.endswith("patch"):
+        return True
+    if suffix == "object" and isinstance(func, ast.Attribute):
+        owner = call_suffix(func.value)
+        return bool(owner) and owner.endswith("patch")
+    return False
+
+
+def scope_45_names(scope: ast.AST) -> set[str]:
+    """Return names bound to literal 45 directly in a scope's body."""
+    names: set[str] = set()
+    for stmt in getattr(scope, "body", []):
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            target = stmt.targets[0]
+            value = stmt.value
+            if (
+                type(target) is ast.Name
+                and type(value) is ast.Constant
+                and value.value == 45
+            ):
+                names.add(target.id)
+    return names
+
+
+class _Rotate45Found(Exception):
+    """Raised to stop the visitor at the first matching rotate call."""
+
+
+class _Rotate45Finder(ast.NodeVisitor):
+    """Single-pass search for rotate(45) calls.
+
+    The module and each FunctionDef push the names they bind to 45, so a
+    rotate(name) call matches a binding in any enclosing scope.
+    """
+
+    def __init__(self) -> None:
+        self.scopes: list[set[str]] = []
+
+    def visit_scope(self, node: ast.AST) -> None:
+        """Track a scope's 45-bound names while visiting its subtree."""
+        self.scopes.append(scope_45_names(node))
+        self.generic_visit(node)
+        self.scopes.pop()
+
+    visit_Module = visit_scope
+    visit_FunctionDef = visit_scope
+
+    def visit_Call(self, node: ast.Call) -> None:
+        """Stop at a rotate call whose argument is 45 or a 45-bound name."""
+        suffix = call_suffix(node.func)
+        if suffix and suffix.endswith("rotate"):
+            for arg in (*node.args, *(kw.value for kw in node.keywords)):
+                # Parsed trees only hold exact node types, so identity checks
+                # replace isinstance in this per-argument loop.
+                arg_type = type(arg)
+                if arg_type is ast.Constant and arg.value == 45:
+                    raise _Rotate45Found
+                if arg_type is ast.Name and any(
+                    arg.id in names for names in self.scopes
+                ):
+                    raise _Rotate45Found
+        self.generic_visit(node)
 
 
 def has_rotate_45(report_path: Path) -> bool:
@@ -94,50 +271,45 @@ def has_rotate_45(report_path: Path) -> bool:
     tree = parse_python(report_path)
     if tree is None:
         return False
-
-    def check_scope(scope: ast.AST) -> bool:
-        assignments: dict[str, bool] = {}
-        for stmt in getattr(scope, "body", []):
-            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
-                target = stmt.targets[0]
-                if isinstance(target, ast.Name) and is_constant_45(stmt.value):
-                    assignments[target.id] = True
-
-        for node in ast.walk(scope):
-            if not isinstance(node, ast.Call):
-                continue
-            func_name = dotted_name(node.func)
-            if func_name and func_name.endswith("rotate"):
-                args = list(node.args)
-                if node.keywords:
-                    keyword_values = [
-                        kw.value for kw in node.keywords if kw.value is not None
-                    ]
-                    args.extend(keyword_values)
-                for arg in args:
-                    if is_constant_45(arg):
-                        return True
-                    if isinstance(arg, ast.Name) and assignments.get(arg.id):
-                        return True
-        return False
-
-    if check_scope(tree):
+    try:
+        _Rotate45Finder().visit(tree)
+    except _Rotate45Found:
         return True
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef) and check_scope(node):
-            return True
     return False
 
 
 def _node_mentions_legacy_crypto(node: ast.AST) -> bool:
     """Return True if node references legacy_crypto."""
-    if isinstance(node, ast.Constant) and isinstance(node.value, str):
-        return "legacy_crypto" in node.value
-    if isinstance(node, ast.Name) and node.id == "legacy_crypto":
-        return True
-    if isinstance(node, ast.Attribute):
-        return _node_mentions_legacy_crypto(node.value)
-    return False
+    node_type = type(node)
+    while node_type is ast.Attribute:
+        node = node.value
+        node_type = type(node)
+    if node_type is ast.Constant:
+        return type(node.value) is str and "legacy_crypto" in node.value
+    return node_type is ast.Name and node.id == "legacy_crypto"
+
+
+def walk_calls(tree: ast.AST):
+    """Yield every Call node in tree, in no particular order.
+
+    A plain stack over ``_fields`` is about twice as fast as ``ast.walk``,
+    which goes through a deque and the nested ``iter_child_nodes`` generator.
+    """
+    call_type = ast.Call
+    ast_type = ast.AST
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node.__class__ is call_type:
+            yield node
+        for name in node._fields:
+            value = getattr(node, name, None)
+            if value.__class__ is list:
+                for item in value:
+                    if isinstance(item, ast_type):
+                        stack.append(item)
+            elif isinstance(value, ast_type):
+                stack.append(value)
 
 
 def mocks_legacy_crypto(tests_dir: Path) -> bool:
@@ -146,48 +318,82 @@ def mocks_legacy_crypto(tests_dir: Path) -> bool:
         return False
 
     for path in tests_dir.rglob("*.py"):
+        # Every match below needs the literal name in the source, so files
+        # without it are never parsed. read_text is memoized for parse_python.
+        if "legacy_crypto" not in read_text(path):
+            continue
         tree = parse_python(path)
         if tree is None:
             continue
-        for node in ast.walk(tree):
-            if not isinstance(node, ast.Call):
-                continue
-            func_name = dotted_name(node.func) or ""
-            if not func_name:
+        for node in walk_calls(tree):
+            suffix = call_suffix(node.func)
+            if not suffix:
                 continue
-            if func_name.endswith("patch") or func_name.endswith("patch.object"):
+            if is_patch_call(node.func, suffix):
                 for arg in node.args:
                     if _node_mentions_legacy_crypto(arg):
                         return True
                 for kw in node.keywords:
                     if kw.value and _node_mentions_legacy_crypto(kw.value):
                         return True
-            if func_name.endswith("setattr"):
+            if suffix.endswith("setattr"):
                 for arg in node.args:
                     if _node_mentions_legacy_crypto(arg):
                         return True
     return False
 
 
-def iter_python_files(root: Path) -> list[Path]:
-    """Return Python files under root excluding caches."""
-    files: list[Path] = []
-    for path in root.rglob("*.py"):
-        if any(part in SKIP_DIRS for part in path.parts):
+def iter_python_file_strs(root: Path) -> list[str]:
+    """Return Python file paths under root, never descending into SKIP_DIRS.
+
+    Paths are the ``str`` values scandir already produced, since the only
+    consumers pass them straight to subprocess argv.
+    """
+    files: list[str] = []
+    pending = [str(root)]
+    while pending:
+        directory = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        files.append(entry.path)
+        except OSError:
             continue
-        files.append(path)
+        # Reversed so directories are visited in scandir order, like rglob.
+        pending.extend(reversed(subdirs))
     return files
 
 
-def run_command(args: list[str], cwd: Path, timeout_seconds: int) -> dict:
-    """Run a command and capture structured output."""
+def run_command(
+    args: list[str],
+    cwd: Path,
+    timeout_seconds: int,
+    line_consumer: Optional[Callable[[str], None]] = None,
+    binary: bool = False,
+    env: Optional[dict[str, str]] = None,
+) -> dict:
+    """Run a command and capture structured output.
+
+    With ``line_consumer``, stdout is streamed to it line by line instead of
+    being buffered, and the returned ``stdout`` is empty. With ``binary``,
+    stdout and stderr are returned undecoded as bytes. ``env`` replaces the
+    inherited environment of the buffered (non-streaming) path.
+    """
+    if line_consumer is not None:
+        return stream_command(args, cwd, timeout_seconds, line_consumer)
     try:
         result = subprocess.run(
             args,
             cwd=str(cwd),
             capture_output=True,
-            text=True,
+            text=not binary,
             timeout=timeout_seconds,
+            env=env,
         )
         return {
             "ok": result.returncode == 0,
@@ -200,10 +406,101 @@ def run_command(args: list[str], cwd: Path, timeout_seconds: int) -> dict:
         return {
             "ok": False,
             "returncode": None,
-            "stdout": exc.stdout or "",
-            "stderr": exc.stderr or "",
+            "stdout": exc.stdout or (b"" if binary else ""),
+            "stderr": exc.stderr or (b"" if binary else ""),
+            "timeout": True,
+        }
+
+
+def stream_command(
+    args: list[str],
+    cwd: Path,
+    timeout_seconds: int,
+    line_consumer: Callable[[str], None],
+) -> dict:
+    """Run a command, feeding stdout lines to a consumer as they arrive.
+
+    The command gets its own process group and the timeout kills the whole
+    group: tools such as semgrep spawn helpers that inherit the pipes, and
+    killing only the direct child would leave the read loop waiting on them.
+    """
+    timed_out = threading.Event()
+    stderr_parts: list[str] = []
+    with subprocess.Popen(
+        args,
+        cwd=str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        start_new_session=True,
+    ) as proc:
+
+        def expire() -> None:
+            timed_out.set()
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                proc.kill()
+
+        # stderr is drained on its own thread so a full pipe cannot stall stdout.
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_parts.append(proc.stderr.read()), daemon=True
+        )
+        stderr_reader.start()
+        killer = threading.Timer(timeout_seconds, expire)
+        killer.start()
+        try:
+            for line in proc.stdout:
+                line_consumer(line)
+            returncode = proc.wait()
+        finally:
+            killer.cancel()
+        stderr_reader.join()
+    if timed_out.is_set():
+        return {
+            "ok": False,
+            "returncode": None,
+            "stdout": "",
+            "stderr": "".join(stderr_parts),
             "timeout": True,
         }
+    return {
+        "ok": returncode == 0,
+        "returncode": returncode,
+        "stdout": "",
+        "stderr": "".join(stderr_parts),
+        "timeout": False,
+    }
+
+
+def trim_output(result: dict) -> dict:
+    """Keep only the tail of a command's stdout/stderr for judge.json."""
+    for key in ("stdout", "stderr"):
+        text = result.get(key)
+        if isinstance(text, bytes):
+            # Timed-out runs can surface undecoded partial output.
+            text = text.decode("utf-8", errors="replace")
+        if isinstance(text, str):
+            result[key] = text[-EXEC_OUTPUT_TAIL:]
+    return result
+
+
+def skipped_exec(reason: str) -> dict:
+    """Build a failed result for an execution step that could not start.
+
+    It keeps the ``run_command`` shape so the pytest cap and coverage
+    scoring treat it exactly like the failing run it replaces.
+    """
+    return {
+        "ok": False,
+        "returncode": None,
+        "stdout": "",
+        "stderr": "",
+        "timeout": False,
+        "skipped": True,
+        "reason": reason,
+    }
 
 
 def run_pytest(run_dir: Path, timeout_seconds: int) -> dict:
@@ -214,10 +511,16 @@ def run_pytest(run_dir: Path, timeout_seconds: int) -> dict:
         "pytest",
         "tests",
         "-q",
+        "-p",
+        "no:cacheprovider",
         "--cov=.",
         "--cov-report=term",
     ]
-    result = run_command(args, run_dir, timeout_seconds)
+    env = dict(os.environ)
+    if sys.version_info >= (3, 12):
+        # sys.monitoring-based tracing is much cheaper than the settrace core.
+        env.setdefault("COVERAGE_CORE", "sysmon")
+    result = run_command(args, run_dir, timeout_seconds, env=env)
     result["coverage_percent"] = parse_coverage_percent(result["stdout"])
     return result
 
@@ -235,19 +538,32 @@ def run_smoke(run_dir: Path, timeout_seconds: int) -> dict:
 
 def parse_coverage_percent(output: str) -> Optional[float]:
     """Parse pytest-cov TOTAL percent from output."""
-    for line in output.splitlines():
-        if not line.strip().startswith("TOTAL"):
-            continue
-        tokens = line.split()
-        for token in tokens:
-            if token.endswith("%"):
+    # Jump between "TOTAL" hits instead of splitting every line of the output.
+    pos = output.find("TOTAL")
+    while pos != -1:
+        line_start = output.rfind("\n", 0, pos) + 1
+        if line_start == pos or output[line_start:pos].isspace():
+            match = COVERAGE_TOKEN_RE.match(output, line_start)
+            if match:
                 try:
-                    return float(token.rstrip("%"))
+                    return float(match.group(1).rstrip("%"))
                 except ValueError:
                     return None
+        pos = output.find("TOTAL", pos + len("TOTAL"))
     return None
 
 
+_TOOL_CACHE: dict[str, bool] = {}
+
+
+def on_path(command: str) -> bool:
+    """Check PATH for a command once, remembering the answer."""
+    available = _TOOL_CACHE.get(command)
+    if available is None:
+        available = _TOOL_CACHE[command] = shutil.which(command) is not None
+    return available
+
+
 def ensure_tool(
     command: str,
     package: str,
@@ -255,12 +571,12 @@ def ensure_tool(
     installer: str = "pip",
 ) -> bool:
     """Ensure a tool exists, optionally installing it."""
-    if shutil.which(command):
+    if on_path(command):
         return True
     if not allow_install:
         return False
     if installer == "npm":
-        if not shutil.which("npm"):
+        if not on_path("npm"):
             return False
         print(f"Missing tool: {command}. Attempting install via npm ({package})...")
         result = subprocess.run(
@@ -279,6 +595,7 @@ def ensure_tool(
         print(result.stdout)
         print(result.stderr)
         return False
+    _TOOL_CACHE[command] = True
     return True
 
 
@@ -311,19 +628,64 @@ def add_quality_check(
     breakdown["score"] += earned
 
 
+def preset_ruff_result() -> Optional[dict]:
+    """Return the config-selected ruff result precomputed by run_test.py.
+
+    run_test.py runs one ruff process over every pending run and passes each
+    run's diagnostic count in TITAN_RUFF_ERRORS; None means run ruff here.
+    """
+    value = os.getenv("TITAN_RUFF_ERRORS", "")
+    if not value.isdigit():
+        return None
+    errors = int(value)
+    return {
+        "ok": errors == 0,
+        "returncode": 0 if errors == 0 else 1,
+        "stdout": "",
+        "stderr": "",
+        "timeout": False,
+        "codes": None,
+        "errors": errors,
+    }
+
+
 def run_ruff_check(run_dir: Path, select: Optional[str] = None) -> dict:
-    """Run ruff with optional selector."""
-    args = ["ruff", "check", "."]
+    """Run ruff with optional selector and collect diagnostic codes."""
+    if select is None:
+        preset = preset_ruff_result()
+        if preset is not None:
+            return preset
+    args = ["ruff", "check", ".", "--output-format", "json"]
     if select:
         args.extend(["--select", select])
-    result = run_command(args, run_dir, QUALITY_TIMEOUT)
-    result["errors"] = len(result["stdout"].splitlines())
+    result = run_command(args, run_dir, QUALITY_TIMEOUT, binary=True)
+    try:
+        diagnostics = loads_json(result["stdout"])
+    except json.JSONDecodeError:
+        diagnostics = None
+    if isinstance(diagnostics, list):
+        result["codes"] = [item.get("code") or "" for item in diagnostics]
+        result["errors"] = len(diagnostics)
+    else:
+        result["codes"] = None
+        result["errors"] = None
     return result
 
 
-def run_pylint_check(run_dir: Path) -> dict:
+def ruff_prefix_errors(result: dict, prefix: str) -> Optional[int]:
+    """Count diagnostics under a rule prefix, or None if ruff itself failed.
+
+    Code-less diagnostics (syntax errors) count toward every prefix, matching
+    what a separate ``--select <prefix>`` run would report.
+    """
+    codes = result.get("codes")
+    if codes is None or result["returncode"] not in (0, 1):
+        return None
+    return sum(1 for code in codes if not code or code.startswith(prefix))
+
+
+def run_pylint_check(run_dir: Path, files: list[str]) -> dict:
     """Run pylint against project Python files."""
-    files = [str(path) for path in iter_python_files(run_dir)]
     if not files:
         return {
             "ok": True,
@@ -351,9 +713,8 @@ def run_xenon_check(run_dir: Path) -> dict:
     return run_command(args, run_dir, QUALITY_TIMEOUT)
 
 
-def run_vulture_check(run_dir: Path) -> dict:
+def run_vulture_check(run_dir: Path, files: list[str]) -> dict:
     """Run vulture dead-code detection."""
-    files = [str(path) for path in iter_python_files(run_dir)]
     if not files:
         return {
             "ok": True,
@@ -367,17 +728,23 @@ def run_vulture_check(run_dir: Path) -> dict:
 
 
 def run_jscpd_check(run_dir: Path) -> dict:
-    """Run jscpd duplication detection and parse report."""
-    output_dir = run_dir / ".jscpd-report"
-    output_dir.mkdir(exist_ok=True)
-    args = [
-        "jscpd",
-        "--config",
-        ".jscpd.json",
-        ".",
-    ]
-    result = run_command(args, run_dir, QUALITY_TIMEOUT)
-    report = parse_jscpd_report(output_dir)
+    """Run jscpd duplication detection and parse report.
+
+    The report goes to a temporary directory rather than the run dir, since
+    other quality tools walk the run dir concurrently.
+    """
+    with tempfile.TemporaryDirectory(prefix="titan-jscpd-") as tmp:
+        output_dir = Path(tmp)
+        args = [
+            "jscpd",
+            "--config",
+            ".jscpd.json",
+            "--output",
+            str(output_dir),
+            ".",
+        ]
+        result = run_command(args, run_dir, QUALITY_TIMEOUT)
+        report = parse_jscpd_report(output_dir)
     if report:
         result["duplicates"] = report.get("duplicates")
         result["percentage"] = report.get("percentage")
@@ -395,7 +762,7 @@ def parse_jscpd_report(output_dir: Path) -> dict:
     if not report_path:
         return {}
     try:
-        data = json.loads(report_path.read_text(encoding="utf-8"))
+        data = loads_json(report_path.read_bytes())
     except json.JSONDecodeError:
         return {}
     if isinstance(data, list):
@@ -414,9 +781,10 @@ def parse_jscpd_report(output_dir: Path) -> dict:
 
 
 def run_mypy_check(run_dir: Path) -> dict:
-    """Run mypy with config file."""
-    args = ["mypy", "--config-file", "mypy.ini", "."]
-    return run_command(args, run_dir, QUALITY_TIMEOUT)
+    """Run mypy with config file, keeping its cache out of the run dir."""
+    with tempfile.TemporaryDirectory(prefix="titan-mypy-") as cache_dir:
+        args = ["mypy", "--config-file", "mypy.ini", "--cache-dir", cache_dir, "."]
+        return run_command(args, run_dir, QUALITY_TIMEOUT)
 
 
 def run_pyright_check(run_dir: Path) -> dict:
@@ -428,10 +796,14 @@ def run_pyright_check(run_dir: Path) -> dict:
 def run_bandit_check(run_dir: Path) -> dict:
     """Run bandit security scan."""
     args = ["bandit", "-r", ".", "-c", "bandit.yaml"]
-    result = run_command(args, run_dir, QUALITY_TIMEOUT)
-    high_issues = sum(
-        1 for line in result["stdout"].splitlines() if "Severity: HIGH" in line
-    )
+    high_issues = 0
+
+    def count_high(line: str) -> None:
+        nonlocal high_issues
+        if "Severity: HIGH" in line:
+            high_issues += 1
+
+    result = run_command(args, run_dir, QUALITY_TIMEOUT, line_consumer=count_high)
     result["high_issues"] = high_issues
     return result
 
@@ -448,16 +820,17 @@ def run_semgrep_check(run_dir: Path) -> dict:
         "off",
         ".",
     ]
-    return run_command(args, run_dir, QUALITY_TIMEOUT)
+    # Only the return code is scored, so findings are discarded as they stream.
+    return run_command(args, run_dir, QUALITY_TIMEOUT, line_consumer=lambda _: None)
 
 
 def run_pip_audit_check(run_dir: Path) -> dict:
     """Run pip-audit against current environment."""
     args = ["pip-audit", "--format", "json"]
-    result = run_command(args, run_dir, QUALITY_TIMEOUT)
+    result = run_command(args, run_dir, QUALITY_TIMEOUT, binary=True)
     vulnerabilities = None
     try:
-        payload = json.loads(result["stdout"])
+        payload = loads_json(result["stdout"])
         vulnerabilities = len(payload)
     except json.JSONDecodeError:
         vulnerabilities = None
@@ -486,10 +859,10 @@ def run_isort_check(run_dir: Path) -> dict:
 def run_license_check(run_dir: Path) -> dict:
     """Run pip-licenses to capture dependency license info."""
     args = ["pip-licenses", "--format", "json"]
-    result = run_command(args, run_dir, QUALITY_TIMEOUT)
+    result = run_command(args, run_dir, QUALITY_TIMEOUT, binary=True)
     package_count = None
     try:
-        payload = json.loads(result["stdout"])
+        payload = loads_json(result["stdout"])
         package_count = len(payload)
     except json.JSONDecodeError:
         package_count = None
@@ -503,15 +876,187 @@ def run_pydocstyle_check(run_dir: Path) -> dict:
     return run_command(args, run_dir, QUALITY_TIMEOUT)
 
 
+def quality_workers() -> int:
+    """Return how many quality commands may run at once.
+
+    run_test.py splits the CPUs between concurrent judges and passes each
+    one's share in TITAN_QUALITY_WORKERS; otherwise every CPU is used.
+    """
+    value = os.getenv("TITAN_QUALITY_WORKERS", "")
+    if value.isdigit() and int(value) > 0:
+        return int(value)
+    return os.cpu_count() or 1
+
+
+def run_quality_parallel(run_dir: Path, commands: dict) -> dict:
+    """Run independent quality commands concurrently and return results by name."""
+    if not commands:
+        return {}
+    max_workers = min(len(commands), quality_workers())
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(command, run_dir) for name, command in commands.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+# (command key, tools it needs, installer, runner, takes the file list).
+# Reasons for skipped checks are derived from the tools listed here.
+QUALITY_COMMANDS = (
+    ("ruff", ("ruff",), "pip", run_ruff_check, False),
+    # UP and C90 share one ruff process and are split by rule prefix.
+    ("ruff_rules", ("ruff",), "pip", partial(run_ruff_check, select="UP,C90"), False),
+    ("xenon", ("xenon",), "pip", run_xenon_check, False),
+    ("pylint", ("pylint",), "pip", run_pylint_check, True),
+    ("vulture", ("vulture",), "pip", run_vulture_check, True),
+    ("jscpd", ("jscpd",), "npm", run_jscpd_check, False),
+    ("mypy", ("mypy", "pyright"), "pip", run_mypy_check, False),
+    ("pyright", ("mypy", "pyright"), "pip", run_pyright_check, False),
+    ("bandit", ("bandit",), "pip", run_bandit_check, False),
+    ("pydocstyle", ("pydocstyle",), "pip", run_pydocstyle_check, False),
+    ("semgrep", ("semgrep",), "pip", run_semgrep_check, False),
+    ("pip_audit", ("pip-audit",), "pip", run_pip_audit_check, False),
+    ("codespell", ("codespell",), "pip", run_codespell_check, False),
+    ("ruff_format", ("ruff",), "pip", run_ruff_format_check, False),
+    ("isort", ("isort",), "pip", run_isort_check, False),
+    ("license", ("pip-licenses",), "pip", run_license_check, False),
+)
+
+# Config files named on a command's argv that the tool refuses to run
+# without (it exits non-zero, so the check could only fail). codespell ignores
+# a missing --config and still passes, so it is not gated; jscpd and pyright
+# are left to run as well rather than guessing how they handle it.
+QUALITY_CONFIGS = {
+    "pylint": ".pylintrc",
+    "mypy": "mypy.ini",
+    "bandit": "bandit.yaml",
+    "pydocstyle": ".pydocstyle",
+}
+
+
+def preflight_skips(run_dir: Path) -> dict[str, str]:
+    """Return skip reasons for commands whose config file is missing.
+
+    These are decided before any tool lookup, so a skipped command never
+    triggers an install or a subprocess. Runs without Python files still
+    run every tool, since several of them pass (and score) on an empty tree.
+    """
+    skips = {}
+    for key, *_rest in QUALITY_COMMANDS:
+        config = QUALITY_CONFIGS.get(key)
+        if config and not (run_dir / config).exists():
+            skips[key] = f"{config} missing"
+    return skips
+
+
+def grade_returncode(res: dict) -> tuple[bool, dict]:
+    """Pass when the command exited cleanly."""
+    return res["ok"], {"returncode": res["returncode"]}
+
+
+def grade_ruff(res: dict) -> tuple[bool, dict]:
+    """Grade the config-selected ruff run."""
+    return res["ok"], {"errors": res.get("errors")}
+
+
+def grade_modernization(rules_res: dict) -> tuple[bool, dict]:
+    """Grade ruff's UP diagnostics from the shared UP/C90 run."""
+    errors = ruff_prefix_errors(rules_res, "UP")
+    return errors == 0, {"errors": errors}
+
+
+def grade_complexity(xenon_res: dict, rules_res: dict) -> tuple[bool, dict]:
+    """Require both xenon and ruff's C90 rules to pass."""
+    ruff_complexity_ok = ruff_prefix_errors(rules_res, "C90") == 0
+    return xenon_res["ok"] and ruff_complexity_ok, {
+        "xenon_ok": xenon_res["ok"],
+        "ruff_c90_ok": ruff_complexity_ok,
+    }
+
+
+def grade_duplication(jscpd_res: dict) -> tuple[bool, dict]:
+    """Prefer jscpd's clone count, falling back to its exit status."""
+    duplicates = jscpd_res.get("duplicates")
+    if isinstance(duplicates, int):
+        ok = duplicates == 0
+    else:
+        ok = jscpd_res["ok"]
+    return ok, {"duplicates": duplicates}
+
+
+def grade_type_check(mypy_res: dict, pyright_res: dict) -> tuple[bool, dict]:
+    """Require both type checkers to pass."""
+    return mypy_res["ok"] and pyright_res["ok"], {
+        "mypy_ok": mypy_res["ok"],
+        "pyright_ok": pyright_res["ok"],
+    }
+
+
+def grade_security(bandit_res: dict) -> tuple[bool, dict]:
+    """Fail on any HIGH severity bandit finding."""
+    return bandit_res.get("high_issues", 0) == 0, {
+        "returncode": bandit_res["returncode"],
+        "high_issues": bandit_res.get("high_issues"),
+    }
+
+
+def grade_coverage(pytest_res: Optional[dict]) -> tuple[bool, dict]:
+    """Compare pytest-cov's total against COVERAGE_MIN."""
+    coverage_percent = None
+    if pytest_res:
+        coverage_percent = pytest_res.get("coverage_percent")
+    coverage_ok = coverage_percent is not None and coverage_percent >= COVERAGE_MIN
+    return coverage_ok, {"coverage_percent": coverage_percent, "min": COVERAGE_MIN}
+
+
+def grade_pip_audit(audit_res: dict) -> tuple[bool, dict]:
+    """Grade pip-audit by exit status, reporting the vulnerability count."""
+    return audit_res["ok"], {
+        "returncode": audit_res["returncode"],
+        "vulnerabilities": audit_res.get("vulnerabilities"),
+    }
+
+
+def grade_license(license_res: dict) -> tuple[bool, dict]:
+    """Grade pip-licenses by exit status, reporting the package count."""
+    return license_res["ok"], {
+        "returncode": license_res["returncode"],
+        "packages": license_res.get("packages"),
+    }
+
+
+# (check name, result keys passed to the grader, grader), in QUALITY_CHECKS
+# order. A check is skipped when any of its results is missing; "pytest"
+# comes from the execution phase rather than QUALITY_COMMANDS.
+QUALITY_GRADERS = (
+    ("ruff", ("ruff",), grade_ruff),
+    ("modernization", ("ruff_rules",), grade_modernization),
+    ("complexity", ("xenon", "ruff_rules"), grade_complexity),
+    ("pylint", ("pylint",), grade_returncode),
+    ("dead_code", ("vulture",), grade_returncode),
+    ("duplication", ("jscpd",), grade_duplication),
+    ("type_check", ("mypy", "pyright"), grade_type_check),
+    ("security", ("bandit",), grade_security),
+    ("coverage", ("pytest",), grade_coverage),
+    ("docstyle", ("pydocstyle",), grade_returncode),
+    ("semgrep", ("semgrep",), grade_returncode),
+    ("pip_audit", ("pip_audit",), grade_pip_audit),
+    ("codespell", ("codespell",), grade_returncode),
+    ("ruff_format", ("ruff_format",), grade_returncode),
+    ("isort", ("isort",), grade_returncode),
+    ("license", ("license",), grade_license),
+)
+
+
 def evaluate_quality(
     run_dir: Path,
     allow_install: bool,
     run_exec: bool,
     exec_results: dict,
+    py_files: Optional[list[str]] = None,
 ) -> tuple[dict, Optional[int]]:
     """Evaluate quality checks and return breakdown plus ruff errors."""
     breakdown = init_quality_breakdown()
-    ruff_errors = None
     if not run_exec:
         for name in QUALITY_CHECKS:
             add_quality_check(
@@ -521,302 +1066,50 @@ def evaluate_quality(
                 skipped=True,
                 details={"reason": "execution disabled"},
             )
-        return breakdown, ruff_errors
-
-    if ensure_tool("ruff", "ruff", allow_install):
-        res = run_ruff_check(run_dir)
-        ruff_errors = res.get("errors")
-        add_quality_check(
-            breakdown,
-            "ruff",
-            ok=res["ok"],
-            details={"errors": ruff_errors},
-        )
-        res_mod = run_ruff_check(run_dir, select="UP")
-        add_quality_check(
-            breakdown,
-            "modernization",
-            ok=res_mod["ok"],
-            details={"errors": res_mod.get("errors")},
-        )
-        res_c90 = run_ruff_check(run_dir, select="C90")
-        ruff_complexity_ok = res_c90["ok"]
-    else:
-        ruff_complexity_ok = None
-        for name in ("ruff", "modernization"):
-            add_quality_check(
-                breakdown,
-                name,
-                ok=False,
-                skipped=True,
-                details={"reason": "ruff missing"},
-            )
+        return breakdown, None
+
+    if py_files is None:
+        py_files = iter_python_file_strs(run_dir)
+
+    # Tool lookup and installs stay serial; the checks themselves are
+    # independent subprocesses, so they run concurrently.
+    available: dict[str, bool] = {}
+    commands = {}
+    missing_reasons = preflight_skips(run_dir)
+    for key, tools, installer, runner, takes_files in QUALITY_COMMANDS:
+        if key in missing_reasons:
+            continue
+        runnable = True
+        for tool in tools:
+            if tool not in available:
+                available[tool] = ensure_tool(tool, tool, allow_install, installer)
+            if not available[tool]:
+                runnable = False
+                break
+        if not runnable:
+            missing_reasons[key] = f"{' or '.join(tools)} missing"
+        elif takes_files:
+            commands[key] = partial(runner, files=py_files)
+        else:
+            commands[key] = runner
+    results = run_quality_parallel(run_dir, commands)
+    results["pytest"] = exec_results.get("pytest") if exec_results else None
 
-    if ensure_tool("xenon", "xenon", allow_install):
-        xenon_res = run_xenon_check(run_dir)
-        if ruff_complexity_ok is None:
+    for name, keys, grader in QUALITY_GRADERS:
+        missing = next((key for key in keys if key not in results), None)
+        if missing is not None:
             add_quality_check(
                 breakdown,
-                "complexity",
+                name,
                 ok=False,
                 skipped=True,
-                details={"reason": "ruff missing"},
-            )
-        else:
-            complexity_ok = xenon_res["ok"] and ruff_complexity_ok
-            add_quality_check(
-                breakdown,
-                "complexity",
-                ok=complexity_ok,
-                details={
-                    "xenon_ok": xenon_res["ok"],
-                    "ruff_c90_ok": ruff_complexity_ok,
-                },
+                details={"reason": missing_reasons[missing]},
             )
-    else:
-        add_quality_check(
-            breakdown,
-            "complexity",
-            ok=False,
-            skipped=True,
-            details={"reason": "xenon missing"},
-        )
-
-    if ensure_tool("pylint", "pylint", allow_install):
-        pylint_res = run_pylint_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "pylint",
-            ok=pylint_res["ok"],
-            details={"returncode": pylint_res["returncode"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "pylint",
-            ok=False,
-            skipped=True,
-            details={"reason": "pylint missing"},
-        )
-
-    if ensure_tool("vulture", "vulture", allow_install):
-        vulture_res = run_vulture_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "dead_code",
-            ok=vulture_res["ok"],
-            details={"returncode": vulture_res["returncode"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "dead_code",
-            ok=False,
-            skipped=True,
-            details={"reason": "vulture missing"},
-        )
-
-    if ensure_tool("jscpd", "jscpd", allow_install, installer="npm"):
-        jscpd_res = run_jscpd_check(run_dir)
-        duplicates = jscpd_res.get("duplicates")
-        if isinstance(duplicates, int):
-            ok = duplicates == 0
-        else:
-            ok = jscpd_res["ok"]
-        add_quality_check(
-            breakdown,
-            "duplication",
-            ok=ok,
-            details={"duplicates": duplicates},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "duplication",
-            ok=False,
-            skipped=True,
-            details={"reason": "jscpd missing"},
-        )
-
-    if ensure_tool("mypy", "mypy", allow_install) and ensure_tool(
-        "pyright",
-        "pyright",
-        allow_install,
-    ):
-        mypy_res = run_mypy_check(run_dir)
-        pyright_res = run_pyright_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "type_check",
-            ok=mypy_res["ok"] and pyright_res["ok"],
-            details={"mypy_ok": mypy_res["ok"], "pyright_ok": pyright_res["ok"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "type_check",
-            ok=False,
-            skipped=True,
-            details={"reason": "mypy or pyright missing"},
-        )
-
-    if ensure_tool("bandit", "bandit", allow_install):
-        bandit_res = run_bandit_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "security",
-            ok=bandit_res.get("high_issues", 0) == 0,
-            details={
-                "returncode": bandit_res["returncode"],
-                "high_issues": bandit_res.get("high_issues"),
-            },
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "security",
-            ok=False,
-            skipped=True,
-            details={"reason": "bandit missing"},
-        )
-
-    pytest_res = exec_results.get("pytest") if exec_results else None
-    coverage_percent = None
-    if pytest_res:
-        coverage_percent = pytest_res.get("coverage_percent")
-    coverage_ok = coverage_percent is not None and coverage_percent >= COVERAGE_MIN
-    add_quality_check(
-        breakdown,
-        "coverage",
-        ok=coverage_ok,
-        details={"coverage_percent": coverage_percent, "min": COVERAGE_MIN},
-    )
-
-    if ensure_tool("pydocstyle", "pydocstyle", allow_install):
-        doc_res = run_pydocstyle_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "docstyle",
-            ok=doc_res["ok"],
-            details={"returncode": doc_res["returncode"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "docstyle",
-            ok=False,
-            skipped=True,
-            details={"reason": "pydocstyle missing"},
-        )
-
-    if ensure_tool("semgrep", "semgrep", allow_install):
-        semgrep_res = run_semgrep_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "semgrep",
-            ok=semgrep_res["ok"],
-            details={"returncode": semgrep_res["returncode"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "semgrep",
-            ok=False,
-            skipped=True,
-            details={"reason": "semgrep missing"},
-        )
-
-    if ensure_tool("pip-audit", "pip-audit", allow_install):
-        audit_res = run_pip_audit_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "pip_audit",
-            ok=audit_res["ok"],
-            details={
-                "returncode": audit_res["returncode"],
-                "vulnerabilities": audit_res.get("vulnerabilities"),
-            },
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "pip_audit",
-            ok=False,
-            skipped=True,
-            details={"reason": "pip-audit missing"},
-        )
-
-    if ensure_tool("codespell", "codespell", allow_install):
-        codespell_res = run_codespell_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "codespell",
-            ok=codespell_res["ok"],
-            details={"returncode": codespell_res["returncode"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "codespell",
-            ok=False,
-            skipped=True,
-            details={"reason": "codespell missing"},
-        )
-
-    if ensure_tool("ruff", "ruff", allow_install):
-        format_res = run_ruff_format_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "ruff_format",
-            ok=format_res["ok"],
-            details={"returncode": format_res["returncode"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "ruff_format",
-            ok=False,
-            skipped=True,
-            details={"reason": "ruff missing"},
-        )
-
-    if ensure_tool("isort", "isort", allow_install):
-        isort_res = run_isort_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "isort",
-            ok=isort_res["ok"],
-            details={"returncode": isort_res["returncode"]},
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "isort",
-            ok=False,
-            skipped=True,
-            details={"reason": "isort missing"},
-        )
-
-    if ensure_tool("pip-licenses", "pip-licenses", allow_install):
-        license_res = run_license_check(run_dir)
-        add_quality_check(
-            breakdown,
-            "license",
-            ok=license_res["ok"],
-            details={
-                "returncode": license_res["returncode"],
-                "packages": license_res.get("packages"),
-            },
-        )
-    else:
-        add_quality_check(
-            breakdown,
-            "license",
-            ok=False,
-            skipped=True,
-            details={"reason": "pip-licenses missing"},
-        )
+            continue
+        ok, details = grader(*(results[key] for key in keys))
+        add_quality_check(breakdown, name, ok=ok, details=details)
 
+    ruff_errors = results["ruff"].get("errors") if "ruff" in results else None
     return breakdown, ruff_errors
 
 
@@ -831,6 +1124,7 @@ def score_titan(
     report: list[str] = []
     details: dict[str, int] = {}
     print("\n⚔️  TITAN PROTOCOL JUDGEMENT  ⚔️\n")
+    clear_parse_caches()
 
     ingest_path = run_dir / "ingest.py"
     if check_file_content(ingest_path, ["legacy_crypto", "secure_hash"]):
@@ -861,8 +1155,25 @@ def score_titan(
 
     exec_results = {"pytest": None, "smoke": None, "skipped": not run_exec}
     if run_exec:
-        exec_results["pytest"] = run_pytest(run_dir, timeout_seconds=EXEC_TIMEOUT)
-        exec_results["smoke"] = run_smoke(run_dir, timeout_seconds=EXEC_TIMEOUT)
+        # Skip interpreter startup when the step could only fail.
+        if (run_dir / "tests").exists():
+            exec_results["pytest"] = trim_output(
+                run_pytest(run_dir, timeout_seconds=EXEC_TIMEOUT)
+            )
+        else:
+            exec_results["pytest"] = skipped_exec("tests/ missing")
+            exec_results["pytest"]["coverage_percent"] = None
+        missing = [
+            name
+            for name in ("ingest", "report")
+            if not (run_dir / f"{name}.py").exists() and not (run_dir / name).is_dir()
+        ]
+        if missing:
+            exec_results["smoke"] = skipped_exec(f"{', '.join(missing)} missing")
+        else:
+            exec_results["smoke"] = trim_output(
+                run_smoke(run_dir, timeout_seconds=EXEC_TIMEOUT)
+            )
 
     allow_install = os.getenv("TITAN_NO_INSTALL") not in TRUTHY
     quality_breakdown, ruff_errors = evaluate_quality(
@@ -903,10 +1214,7 @@ def score_titan(
         "quality_breakdown": quality_breakdown,
     }
     if write_json:
-        (run_dir / "judge.json").write_text(
-            json.dumps(payload, indent=2),
-            encoding="utf-8",
-        )
+        dump_json(payload, run_dir / "judge.json")
     return payload
 
 
@@ -8,35 +8,44 @@ import sys
 from pathlib import Path
 
 
-def ensure_otel():
-    try:
-        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (  # noqa: F401
-            OTLPSpanExporter,
-        )
-        from opentelemetry.sdk.resources import Resource  # noqa: F401
-        from opentelemetry.sdk.trace import TracerProvider  # noqa: F401
-        from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: F401
-        from opentelemetry.trace import SpanKind, Status, StatusCode  # noqa: F401
-    except ModuleNotFoundError:
-        if os.getenv("TITAN_NO_INSTALL") == "1":
-            raise SystemExit("OpenTelemetry SDK missing and TITAN_NO_INSTALL=1")
-        subprocess.check_call(
-            [
-                sys.executable,
-                "-m",
-                "pip",
-                "install",
-                "opentelemetry-sdk",
-                "opentelemetry-exporter-otlp",
-            ]
-        )
+OTEL_PACKAGES = ("opentelemetry-sdk", "opentelemetry-exporter-otlp")
+_OTEL = None
+
+
+def load_otel():
     from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
     from opentelemetry.sdk.resources import Resource
     from opentelemetry.sdk.trace import TracerProvider
-    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
     from opentelemetry.trace import SpanKind, Status, StatusCode
 
-    return OTLPSpanExporter, Resource, TracerProvider, SimpleSpanProcessor, SpanKind, Status, StatusCode
+    return OTLPSpanExporter, Resource, TracerProvider, BatchSpanProcessor, SpanKind, Status, StatusCode
+
+
+def ensure_otel():
+    # Installing here would put a cold pip run on the wrapped command's critical
+    # path; run_suite.sh installs the SDK once before any tool starts instead.
+    global _OTEL
+    if _OTEL is None:
+        try:
+            _OTEL = load_otel()
+        except ModuleNotFoundError:
+            raise SystemExit(
+                f"OpenTelemetry SDK missing; run: {sys.executable} -m pip install "
+                + " ".join(OTEL_PACKAGES)
+            ) from None
+    return _OTEL
+
+
+def tracing_enabled() -> bool:
+    # Without a configured endpoint there is no collector to export to, so
+    # skip the SDK import and the exporter's connection-refused retries.
+    if os.getenv("OTEL_SDK_DISABLED", "").lower() == "true":
+        return False
+    return bool(
+        os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+        or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    )
 
 
 def main() -> None:
@@ -53,7 +62,10 @@ def main() -> None:
     if not cmd:
         raise SystemExit("No command provided.")
 
-    OTLPSpanExporter, Resource, TracerProvider, SimpleSpanProcessor, SpanKind, Status, StatusCode = ensure_otel()
+    if not tracing_enabled():
+        sys.exit(subprocess.run(cmd, check=False).returncode)
+
+    OTLPSpanExporter, Resource, TracerProvider, BatchSpanProcessor, SpanKind, Status, StatusCode = ensure_otel()
 
     service_name = os.getenv("OTEL_SERVICE_NAME", "titan-protocol")
     deployment_env = os.getenv("OTEL_DEPLOYMENT_ENVIRONMENT")
@@ -62,7 +74,16 @@ def main() -> None:
         resource_attrs["deployment.environment"] = deployment_env
 
     provider = TracerProvider(resource=Resource.create(resource_attrs))
-    provider.add_span_processor(SimpleSpanProcessor(OTLPSpanExporter()))
+    # Export runs on the processor's worker thread instead of inside span.end().
+    provider.add_span_processor(
+        BatchSpanProcessor(
+            OTLPSpanExporter(),
+            max_queue_size=4096,
+            schedule_delay_millis=1000,
+            max_export_batch_size=256,
+            export_timeout_millis=10000,
+        )
+    )
 
     from opentelemetry import trace
 
@@ -84,6 +105,8 @@ def main() -> None:
         if result.returncode != 0:
             span.set_status(Status(StatusCode.ERROR))
 
+    # Bound the wait on a slow or unreachable collector before shutting down.
+    provider.force_flush(timeout_millis=5000)
     provider.shutdown()
     sys.exit(result.returncode)
 
@@ -2,24 +2,31 @@
 """Capture PHASE markers from stdin and write a phase log for telemetry."""
 
 import argparse
-import os
 import re
-import subprocess
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 PHASE_REGEX = re.compile(r"\bPHASE:\s*([A-Z][A-Z0-9_-]*)", re.IGNORECASE)
+# Cheap scan of raw stdin bytes; only lines it hits are decoded and matched.
+PHASE_PREFILTER = re.compile(rb"PHASE:", re.IGNORECASE)
+READ_SIZE = 64 * 1024
 
 
-def ensure_pendulum():
-    try:
-        import pendulum  # type: ignore
-    except ModuleNotFoundError:
-        if os.getenv("TITAN_NO_INSTALL") == "1":
-            raise SystemExit("pendulum not installed and TITAN_NO_INSTALL=1")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "pendulum"])
-        import pendulum  # type: ignore
-    return pendulum
+def iter_phases(block: bytes):
+    # First marker on each line of a block that holds only whole lines.
+    line_end = 0
+    for hit in PHASE_PREFILTER.finditer(block):
+        if hit.start() < line_end:
+            continue
+        line_start = block.rfind(b"\n", 0, hit.start()) + 1
+        line_end = block.find(b"\n", hit.end())
+        if line_end == -1:
+            line_end = len(block)
+        line = block[line_start:line_end].decode("utf-8", errors="replace")
+        match = PHASE_REGEX.search(line)
+        if match:
+            yield match.group(1).upper()
 
 
 def main() -> None:
@@ -33,22 +40,40 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    pendulum = ensure_pendulum()
     log_path = Path(args.phase_log).expanduser().resolve()
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if hasattr(sys.stdout, "reconfigure"):
-        sys.stdout.reconfigure(line_buffering=True)
-
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    pending = b""
     with log_path.open("a", encoding="utf-8") as log:
-        for line in sys.stdin:
-            sys.stdout.write(line)
-            match = PHASE_REGEX.search(line)
-            if match:
-                phase = match.group(1).upper()
-                timestamp = pendulum.now("UTC").to_iso8601_string()
-                log.write(f"{timestamp},{phase}\n")
+        while True:
+            # read1 returns whatever is available, so output is not held back
+            # waiting for a full chunk; each chunk costs one write syscall.
+            chunk = stdin.read1(READ_SIZE)
+            if chunk:
+                stdout.write(chunk)
+                stdout.flush()
+                cut = chunk.rfind(b"\n") + 1
+                if not cut:
+                    pending += chunk
+                    continue
+                block = pending + chunk[:cut]
+                pending = chunk[cut:]
+            else:
+                block, pending = pending, b""
+            phases = list(iter_phases(block))
+            if phases:
+                # Millisecond "Z" form hits collect_telemetry's fast ISO parser.
+                timestamp = (
+                    datetime.now(timezone.utc)
+                    .isoformat(timespec="milliseconds")
+                    .replace("+00:00", "Z")
+                )
+                log.writelines(f"{timestamp},{phase}\n" for phase in phases)
                 log.flush()
+            if not chunk:
+                break
 
 
 if __name__ == "__main__":
@@ -113,6 +113,17 @@ if [[ -n "$OPENLIT_ENABLE" || -n "$OPENLIT_ENDPOINT" ]]; then
   fi
 fi
 
+if [[ -n "$OPENLIT_TRACE_TOOLS" ]]; then
+  # otel_span.py never installs; fetch its SDK once before any tool starts.
+  if ! python3 -c "import opentelemetry.sdk, opentelemetry.exporter.otlp.proto.http" 2>/dev/null; then
+    if [[ "${TITAN_NO_INSTALL:-}" == "1" ]]; then
+      echo "OpenTelemetry SDK missing and TITAN_NO_INSTALL=1" >&2
+      exit 1
+    fi
+    python3 -m pip install opentelemetry-sdk opentelemetry-exporter-otlp
+  fi
+fi
+
 openlit_args=(openlit-instrument --service-name "$OPENLIT_SERVICE_NAME" --environment "$OPENLIT_ENVIRONMENT")
 if [[ -n "$OPENLIT_ENDPOINT" ]]; then
   openlit_args+=(--otlp-endpoint "$OPENLIT_ENDPOINT")
@@ -167,7 +178,9 @@ run_tool() {
   local phase_name="$3"
   shift 3
   if [[ -n "$OPENLIT_TRACE_TOOLS" ]]; then
-    python3 "$REPO_ROOT/titan_protocol/otel_span.py" --name "$span_name" --tool "$tool_name" --phase "$phase_name" -- "$@"
+    # otel_span.py only traces when an endpoint is set; keep the SDK's default.
+    OTEL_EXPORTER_OTLP_ENDPOINT="${OTEL_EXPORTER_OTLP_ENDPOINT:-http://127.0.0.1:4318}" \
+      python3 "$REPO_ROOT/titan_protocol/otel_span.py" --name "$span_name" --tool "$tool_name" --phase "$phase_name" -- "$@"
   else
     "$@"
   fi
@@ -2,15 +2,24 @@
 """Prepare Titan Protocol test runs and score them into a CSV."""
 
 import argparse
-import csv
 import datetime as dt
+import os
 import re
-import shutil
-import subprocess
 import sys
 import json
+import operator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# csv, shutil and subprocess are imported inside the functions that use them:
+# --prepare never needs csv or subprocess, and each costs milliseconds to load
+# on every invocation of this script.
+
+try:
+    import orjson
+except ModuleNotFoundError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 TEMPLATE_FILES = [
     "legacy_crypto.py",
     "TITAN_SPEC.md",
@@ -30,18 +39,24 @@ TEMPLATE_FILES = [
 
 DEFAULT_TOOLS = ["ampcode", "augment", "opencode"]
 SCORED_MARKER = ".scored"
+RUFF_BATCH_TIMEOUT = 300
+JSON_ARRAY_TAIL = 4096
+COPY_WORKERS = 8
 REQUIRED_OUTPUTS = ["ingest.py", "report.py", "main.py", "tests"]
 DEFAULT_OUTPUT_ROOT = Path.home() / "titan_protocol_runs"
 
-SCORE_PATTERNS = {
-    "context": re.compile(r"\[(\d+)/25\].*Context Trap", re.IGNORECASE),
-    "research": re.compile(r"\[(\d+)/25\].*Research Trap", re.IGNORECASE),
-    "qa": re.compile(r"\[(\d+)/20\].*QA Trap", re.IGNORECASE),
-    "quality": re.compile(r"\[(\d+)/20\].*Quality", re.IGNORECASE),
-    "docs": re.compile(r"\[(\d+)/10\].*Documentation", re.IGNORECASE),
-    "final": re.compile(r"FINAL SCORE:\s*(\d+)/100", re.IGNORECASE),
-    "ruff_errors": re.compile(r"Linter Failed \((\d+) errors\)", re.IGNORECASE),
-}
+# One alternation with a named digit group per key, so parse_score scans the
+# judge output once; match.lastgroup names the key that matched.
+SCORE_RE = re.compile(
+    r"\[(?P<context>\d+)/25\].*Context Trap"
+    r"|\[(?P<research>\d+)/25\].*Research Trap"
+    r"|\[(?P<qa>\d+)/20\].*QA Trap"
+    r"|\[(?P<quality>\d+)/20\].*Quality"
+    r"|\[(?P<docs>\d+)/10\].*Documentation"
+    r"|FINAL SCORE:\s*(?P<final>\d+)/100"
+    r"|Linter Failed \((?P<ruff_errors>\d+) errors\)",
+    re.IGNORECASE,
+)
 CSV_FIELDS = [
     "timestamp",
     "tool",
@@ -88,6 +103,18 @@ CSV_FIELDS = [
     "slash_commands",
     "telemetry_json",
 ]
+# Pulls a row's values in CSV_FIELDS order in one C call, so the hot append path
+# can use csv.writer instead of DictWriter's per-row key validation.
+CSV_ROW = operator.itemgetter(*CSV_FIELDS)
+# Telemetry values stored as JSON text in their own CSV columns.
+TELEMETRY_JSON_FIELDS = (
+    "phase_timeline",
+    "phase_durations_ms",
+    "tools_used",
+    "subagents",
+    "skills_used",
+    "slash_commands",
+)
 
 
 def parse_score(output: str) -> dict:
@@ -100,20 +127,39 @@ def parse_score(output: str) -> dict:
         "final": None,
         "ruff_errors": None,
     }
-    for key, pattern in SCORE_PATTERNS.items():
-        match = pattern.search(output)
-        if match:
-            value = match.group(1)
-            result[key] = int(value)
+    for match in SCORE_RE.finditer(output):
+        key = match.lastgroup
+        if result[key] is None:
+            result[key] = int(match.group(key))
     return result
 
 
+def loads_json(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj, indent: bool = False) -> bytes:
+    # The stdlib fallback mirrors orjson's output (compact, UTF-8 unescaped) so
+    # results look the same whichever encoder ran.
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_cell(value) -> str | None:
+    return dumps_json(value).decode("utf-8") if value else None
+
+
 def load_judge_json(run_dir: Path) -> dict:
     judge_path = run_dir / "judge.json"
     if not judge_path.exists():
         return {}
     try:
-        return json.loads(judge_path.read_text(encoding="utf-8"))
+        return loads_json(judge_path.read_bytes())
     except json.JSONDecodeError:
         return {}
 
@@ -153,11 +199,34 @@ def unique_run_dir(tool_root: Path, timestamp: str, run_idx: int) -> Path:
         suffix += 1
 
 
+def copy_template(src: Path, dst: Path) -> None:
+    # Agents rewrite these files, so each run needs its own inode; a hardlink
+    # would let an edit leak back into the template. copy_file_range keeps the
+    # copy in the kernel and reflinks on CoW filesystems (Btrfs, XFS, ZFS).
+    import shutil
+
+    try:
+        with src.open("rb") as fsrc, dst.open("wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    # Some filesystems report 0 instead of an error; never
+                    # keep a truncated template.
+                    raise OSError("copy_file_range copied nothing")
+                remaining -= copied
+        shutil.copystat(src, dst)
+    except (AttributeError, OSError):
+        shutil.copy2(src, dst)
+
+
 def prepare_runs(base_dir: Path, output_root: Path, tools: list, runs: int) -> list:
     runs_root = output_root / "runs"
     runs_root.mkdir(parents=True, exist_ok=True)
 
     created = []
+    sources = []
+    destinations = []
     timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     for tool in tools:
         tool_root = runs_root / tool
@@ -166,21 +235,47 @@ def prepare_runs(base_dir: Path, output_root: Path, tools: list, runs: int) -> l
             run_dir = unique_run_dir(tool_root, timestamp, idx)
             run_dir.mkdir()
             for filename in TEMPLATE_FILES:
-                src = base_dir / filename
-                dst = run_dir / filename
-                shutil.copy2(src, dst)
+                sources.append(base_dir / filename)
+                destinations.append(run_dir / filename)
             created.append(run_dir)
+    # Copies are independent and syscall-bound, so overlapping them hides
+    # filesystem latency; list() re-raises the first copy error.
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+        list(pool.map(copy_template, sources, destinations))
     return created
 
 
+def has_python_file(root: str) -> bool:
+    # Depth-first scandir that stops at the first *.py entry, unlike
+    # any(rglob("*.py")) which sets up a full recursive glob first.
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".py"):
+                        return True
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except OSError:
+            continue
+    return False
+
+
 def check_completion(run_dir: Path) -> tuple[bool, list]:
+    # One scandir answers every existence check instead of a stat per output.
+    try:
+        with os.scandir(run_dir) as it:
+            entries = {entry.name: entry for entry in it}
+    except OSError:
+        entries = {}
     missing = []
     for name in REQUIRED_OUTPUTS:
-        path = run_dir / name
+        entry = entries.get(name)
         if name == "tests":
-            if not path.exists() or not any(path.rglob("*.py")):
+            if entry is None or not entry.is_dir() or not has_python_file(entry.path):
                 missing.append(name)
-        elif not path.exists():
+        elif entry is None:
             missing.append(name)
     return len(missing) == 0, missing
 
@@ -190,11 +285,189 @@ def load_telemetry(run_dir: Path) -> dict:
     if not telemetry_path.exists():
         return {}
     try:
-        return json.loads(telemetry_path.read_text(encoding="utf-8"))
+        return loads_json(telemetry_path.read_bytes())
     except json.JSONDecodeError:
         return {}
 
 
+def batch_ruff_errors(run_dirs: list) -> dict:
+    # One ruff process for every run instead of one per judge. Ruff resolves
+    # config per file, so each run is still checked against its own ruff.toml.
+    # Runs missing from the result fall back to judge.py running ruff itself.
+    import shutil
+    import subprocess
+
+    if not run_dirs or shutil.which("ruff") is None:
+        return {}
+    try:
+        proc = subprocess.run(
+            ["ruff", "check", "--output-format", "json", *map(str, run_dirs)],
+            capture_output=True,
+            timeout=RUFF_BATCH_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if proc.returncode not in (0, 1):
+        return {}
+    try:
+        diagnostics = loads_json(proc.stdout)
+    except json.JSONDecodeError:
+        return {}
+    by_root = {run_dir.absolute(): run_dir for run_dir in run_dirs}
+    by_root.update({run_dir.resolve(): run_dir for run_dir in run_dirs})
+    counts = dict.fromkeys(run_dirs, 0)
+    for item in diagnostics:
+        for parent in Path(item.get("filename") or "").parents:
+            run_dir = by_root.get(parent)
+            if run_dir is not None:
+                counts[run_dir] += 1
+                break
+    return counts
+
+
+def score_run(
+    run_dir: Path,
+    ruff_errors: int | None = None,
+    scored_at: str | None = None,
+    quality_workers: int | None = None,
+) -> dict:
+    import subprocess
+
+    marker = run_dir / SCORED_MARKER
+    complete, missing = check_completion(run_dir)
+    log_path = run_dir / "judge.log"
+    proc = None
+    score = {
+        "context": None,
+        "research": None,
+        "qa": None,
+        "quality": None,
+        "docs": None,
+        "final": None,
+        "ruff_errors": None,
+    }
+
+    if complete:
+        env = None
+        if ruff_errors is not None or quality_workers is not None:
+            env = dict(os.environ)
+            if ruff_errors is not None:
+                env["TITAN_RUFF_ERRORS"] = str(ruff_errors)
+            if quality_workers is not None:
+                env["TITAN_QUALITY_WORKERS"] = str(quality_workers)
+        # The judge writes its combined output straight into judge.log, so it is
+        # never buffered here; the log is only read back if judge.json is missing.
+        with log_path.open("wb") as log:
+            proc = subprocess.run(
+                [sys.executable, "judge.py"],
+                cwd=str(run_dir),
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                env=env,
+            )
+        judge_payload = load_judge_json(run_dir)
+        if judge_payload:
+            score = {
+                "context": judge_payload.get("context"),
+                "research": judge_payload.get("research"),
+                "qa": judge_payload.get("qa"),
+                "quality": judge_payload.get("quality"),
+                "docs": judge_payload.get("docs"),
+                "final": judge_payload.get("score"),
+                "ruff_errors": judge_payload.get("ruff_errors"),
+                "quality_breakdown": judge_payload.get("quality_breakdown"),
+            }
+            score = apply_pytest_cap(score, judge_payload)
+        else:
+            score = parse_score(log_path.read_text(encoding="utf-8", errors="replace"))
+    else:
+        log_path.write_text(
+            f"INCOMPLETE RUN: missing {', '.join(missing)}\n", encoding="utf-8"
+        )
+
+    if scored_at is None:
+        scored_at = dt.datetime.now().isoformat(timespec="seconds")
+    if complete:
+        marker.write_text(scored_at, encoding="utf-8")
+    telemetry = load_telemetry(run_dir)
+    quality_breakdown = score.get("quality_breakdown") or {}
+    checks = quality_breakdown.get("checks") or {}
+    row = {
+        "timestamp": scored_at,
+        "tool": run_dir.parent.name,
+        "run_id": run_dir.name,
+        "complete": complete,
+        "missing": ",".join(missing),
+        "score": score["final"],
+        "context": score["context"],
+        "research": score["research"],
+        "qa": score["qa"],
+        "quality": score["quality"],
+        "quality_ruff": checks.get("ruff", {}).get("earned"),
+        "quality_modernization": checks.get("modernization", {}).get("earned"),
+        "quality_complexity": checks.get("complexity", {}).get("earned"),
+        "quality_pylint": checks.get("pylint", {}).get("earned"),
+        "quality_dead_code": checks.get("dead_code", {}).get("earned"),
+        "quality_duplication": checks.get("duplication", {}).get("earned"),
+        "quality_type_check": checks.get("type_check", {}).get("earned"),
+        "quality_security": checks.get("security", {}).get("earned"),
+        "quality_coverage": checks.get("coverage", {}).get("earned"),
+        "quality_docstyle": checks.get("docstyle", {}).get("earned"),
+        "quality_semgrep": checks.get("semgrep", {}).get("earned"),
+        "quality_pip_audit": checks.get("pip_audit", {}).get("earned"),
+        "quality_codespell": checks.get("codespell", {}).get("earned"),
+        "quality_ruff_format": checks.get("ruff_format", {}).get("earned"),
+        "quality_isort": checks.get("isort", {}).get("earned"),
+        "quality_license": checks.get("license", {}).get("earned"),
+        "quality_details": json_cell(quality_breakdown),
+        "docs": score["docs"],
+        "ruff_errors": score["ruff_errors"],
+        "judge_exit": proc.returncode if proc else -1,
+        "model": telemetry.get("model"),
+        "variant": telemetry.get("variant"),
+        "session_id": telemetry.get("session_id"),
+        "tokens_prompt": telemetry.get("tokens_prompt"),
+        "tokens_completion": telemetry.get("tokens_completion"),
+        "tokens_total": telemetry.get("tokens_total"),
+        "duration_ms": telemetry.get("duration_ms"),
+        **{field: json_cell(telemetry.get(field)) for field in TELEMETRY_JSON_FIELDS},
+        "telemetry_json": json_cell(telemetry),
+    }
+    return row
+
+
+def iter_scored_rows(run_dirs: list, jobs: int):
+    # Yields each row as soon as its judge finishes, in completion order, so
+    # the caller can persist results while later runs are still being judged.
+    if not run_dirs:
+        return
+    complete = [run_dir for run_dir in run_dirs if check_completion(run_dir)[0]]
+    ruff_errors = batch_ruff_errors(complete)
+    # One timestamp for the whole batch: rows and .scored markers from a
+    # single score pass share it instead of formatting the clock per run.
+    scored_at = dt.datetime.now().isoformat(timespec="seconds")
+    # Judges are subprocess-bound, so threads overlap them fine. The first
+    # complete run is judged alone so tool auto-installs happen once instead
+    # of racing pip across concurrent judges.
+    first = run_dirs.index(complete[0]) if complete else 0
+    yield score_run(run_dirs[first], ruff_errors.get(run_dirs[first]), scored_at)
+    rest = run_dirs[:first] + run_dirs[first + 1 :]
+    if not rest:
+        return
+    workers = max(1, min(jobs, len(rest)))
+    # Each judge also fans its quality tools out over threads; splitting the
+    # CPUs between concurrent judges keeps the total near the CPU count, so
+    # tool timeouts (and scores) do not depend on how many runs are judged.
+    budget = max(1, (os.cpu_count() or 1) // workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(score_run, run_dir, ruff_errors.get(run_dir), scored_at, budget)
+            for run_dir in rest
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
 def score_runs(
     base_dir: Path,
     output_root: Path,
@@ -202,191 +475,90 @@ def score_runs(
     out_csv: Path,
     out_json: Path,
     rescore: bool,
+    jobs: int = 1,
 ) -> list:
+    import csv
+
     runs_root = output_root / "runs"
     if not runs_root.exists():
         raise FileNotFoundError("No runs directory found. Run prepare first.")
 
-    run_dirs = []
+    pending = []
     for tool in tools:
         tool_root = runs_root / tool
         if not tool_root.exists():
             continue
-        for path in sorted(tool_root.glob("*/")):
-            if (path / "judge.py").exists():
-                run_dirs.append(path)
-
-    rows = []
-    for run_dir in run_dirs:
-        marker = run_dir / SCORED_MARKER
-        if marker.exists() and not rescore:
-            continue
-
-        complete, missing = check_completion(run_dir)
-        output = ""
-        proc = None
-        score = {
-            "context": None,
-            "research": None,
-            "qa": None,
-            "quality": None,
-            "docs": None,
-            "final": None,
-            "ruff_errors": None,
-        }
-
-        if complete:
-            proc = subprocess.run(
-                [sys.executable, "judge.py"],
-                cwd=str(run_dir),
-                capture_output=True,
-                text=True,
-            )
-            output = proc.stdout + proc.stderr
-            judge_payload = load_judge_json(run_dir)
-            if judge_payload:
-                score = {
-                    "context": judge_payload.get("context"),
-                    "research": judge_payload.get("research"),
-                    "qa": judge_payload.get("qa"),
-                    "quality": judge_payload.get("quality"),
-                    "docs": judge_payload.get("docs"),
-                    "final": judge_payload.get("score"),
-                    "ruff_errors": judge_payload.get("ruff_errors"),
-                    "quality_breakdown": judge_payload.get("quality_breakdown"),
-                }
-                score = apply_pytest_cap(score, judge_payload)
-            else:
-                score = parse_score(output)
-        else:
-            output = f"INCOMPLETE RUN: missing {', '.join(missing)}\n"
-
-        (run_dir / "judge.log").write_text(output, encoding="utf-8")
-        if complete:
-            marker.write_text(
-                dt.datetime.now().isoformat(timespec="seconds"),
-                encoding="utf-8",
-            )
-        telemetry = load_telemetry(run_dir)
-        quality_breakdown = score.get("quality_breakdown") or {}
-        checks = quality_breakdown.get("checks") or {}
-        row = {
-            "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
-            "tool": run_dir.parent.name,
-            "run_id": run_dir.name,
-            "complete": complete,
-            "missing": ",".join(missing),
-            "score": score["final"],
-            "context": score["context"],
-            "research": score["research"],
-            "qa": score["qa"],
-            "quality": score["quality"],
-            "quality_ruff": checks.get("ruff", {}).get("earned"),
-            "quality_modernization": checks.get("modernization", {}).get("earned"),
-            "quality_complexity": checks.get("complexity", {}).get("earned"),
-            "quality_pylint": checks.get("pylint", {}).get("earned"),
-            "quality_dead_code": checks.get("dead_code", {}).get("earned"),
-            "quality_duplication": checks.get("duplication", {}).get("earned"),
-            "quality_type_check": checks.get("type_check", {}).get("earned"),
-            "quality_security": checks.get("security", {}).get("earned"),
-            "quality_coverage": checks.get("coverage", {}).get("earned"),
-            "quality_docstyle": checks.get("docstyle", {}).get("earned"),
-            "quality_semgrep": checks.get("semgrep", {}).get("earned"),
-            "quality_pip_audit": checks.get("pip_audit", {}).get("earned"),
-            "quality_codespell": checks.get("codespell", {}).get("earned"),
-            "quality_ruff_format": checks.get("ruff_format", {}).get("earned"),
-            "quality_isort": checks.get("isort", {}).get("earned"),
-            "quality_license": checks.get("license", {}).get("earned"),
-            "quality_details": (
-                json.dumps(quality_breakdown) if quality_breakdown else None
-            ),
-            "docs": score["docs"],
-            "ruff_errors": score["ruff_errors"],
-            "judge_exit": proc.returncode if proc else -1,
-            "model": telemetry.get("model"),
-            "variant": telemetry.get("variant"),
-            "session_id": telemetry.get("session_id"),
-            "tokens_prompt": telemetry.get("tokens_prompt"),
-            "tokens_completion": telemetry.get("tokens_completion"),
-            "tokens_total": telemetry.get("tokens_total"),
-            "duration_ms": telemetry.get("duration_ms"),
-            "phase_timeline": (
-                json.dumps(telemetry.get("phase_timeline"))
-                if telemetry.get("phase_timeline")
-                else None
-            ),
-            "phase_durations_ms": (
-                json.dumps(telemetry.get("phase_durations_ms"))
-                if telemetry.get("phase_durations_ms")
-                else None
-            ),
-            "tools_used": (
-                json.dumps(telemetry.get("tools_used"))
-                if telemetry.get("tools_used")
-                else None
-            ),
-            "subagents": (
-                json.dumps(telemetry.get("subagents"))
-                if telemetry.get("subagents")
-                else None
-            ),
-            "skills_used": (
-                json.dumps(telemetry.get("skills_used"))
-                if telemetry.get("skills_used")
-                else None
-            ),
-            "slash_commands": (
-                json.dumps(telemetry.get("slash_commands"))
-                if telemetry.get("slash_commands")
-                else None
-            ),
-            "telemetry_json": json.dumps(telemetry) if telemetry else None,
-        }
-        rows.append(row)
-
+        # scandir's d_type answers is_dir() without a stat per entry. Runs are
+        # taken in directory order: rows are written in judge completion order
+        # and keyed by run_id, so sorting the names would buy nothing.
+        with os.scandir(tool_root) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                # Already-scored runs are dropped on the first stat, before the
+                # judge.py check.
+                if not rescore and os.path.exists(
+                    os.path.join(entry.path, SCORED_MARKER)
+                ):
+                    continue
+                if os.path.exists(os.path.join(entry.path, "judge.py")):
+                    pending.append(Path(entry.path))
+
+    # Steady-state scoring only appends; a CSV written under an older schema is
+    # brought up to date by the one-shot --migrate-csv, not on every score run.
     out_csv.parent.mkdir(parents=True, exist_ok=True)
-    ensure_csv_schema(out_csv)
-    with out_csv.open("a", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writerows(rows)
-
     out_json.parent.mkdir(parents=True, exist_ok=True)
-    with out_json.open("a", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row) + "\n")
-
-    out_json_array = json_array_path(out_json)
-    write_json_array(out_json, out_json_array)
+    has_header = out_csv.exists()
+    rows = []
+    # Each row is flushed to the CSV and JSONL as its judge finishes, so an
+    # interrupted batch keeps every result scored so far.
+    with (
+        out_csv.open("a" if has_header else "w", newline="") as csv_file,
+        out_json.open("ab") as jsonl_file,
+    ):
+        writer = csv.writer(csv_file)
+        if not has_header:
+            writer.writerow(CSV_FIELDS)
+            csv_file.flush()
+        try:
+            for row in iter_scored_rows(pending, jobs):
+                writer.writerow(CSV_ROW(row))
+                csv_file.flush()
+                jsonl_file.write(dumps_json(row) + b"\n")
+                jsonl_file.flush()
+                rows.append(row)
+        finally:
+            # Keep results.json in step with whatever reached the JSONL.
+            append_json_array(rows, out_json, json_array_path(out_json))
 
     return rows
 
 
-def ensure_csv_schema(out_csv: Path) -> None:
-    if not out_csv.exists():
-        with out_csv.open("w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-            writer.writeheader()
-        return
-
-    with out_csv.open(newline="") as f:
-        reader = csv.reader(f)
-        existing_header = next(reader, [])
-
-    if existing_header == CSV_FIELDS:
-        return
-
-    rows = []
-    with out_csv.open(newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
+def ensure_csv_schema(out_csv: Path) -> bool:
+    # Backs --migrate-csv. Returns False when there is no CSV to migrate.
+    import csv
 
-    with out_csv.open("w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        for row in rows:
-            normalized = {field: row.get(field) for field in CSV_FIELDS}
-            writer.writerow(normalized)
+    if not out_csv.exists():
+        return False
+
+    # Stream old rows into a sibling temp file and swap it in, so memory stays
+    # at one row and a crash mid-rewrite leaves the original CSV intact.
+    tmp_csv = out_csv.with_name(out_csv.name + ".tmp")
+    with out_csv.open(newline="") as src:
+        reader = csv.DictReader(src)
+        if reader.fieldnames == CSV_FIELDS:
+            return True
+        try:
+            with tmp_csv.open("w", newline="") as dst:
+                writer = csv.DictWriter(dst, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                for row in reader:
+                    writer.writerow({field: row.get(field) for field in CSV_FIELDS})
+        except BaseException:
+            tmp_csv.unlink(missing_ok=True)
+            raise
+    os.replace(tmp_csv, out_csv)
+    return True
 
 
 def json_array_path(out_jsonl: Path) -> Path:
@@ -395,20 +567,46 @@ def json_array_path(out_jsonl: Path) -> Path:
     return out_jsonl.with_suffix(out_jsonl.suffix + ".json")
 
 
+def append_json_array(rows: list, out_jsonl: Path, out_json: Path) -> None:
+    # Splice new rows in before the closing bracket instead of rebuilding the
+    # array from the whole JSONL history on every score run. The result is
+    # byte-identical to a rebuild; anything unexpected falls back to one.
+    try:
+        with out_json.open("r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(size - JSON_ARRAY_TAIL, 0))
+            tail = f.read()
+            head = tail.rstrip()
+            if not head.endswith(b"]"):
+                raise ValueError("not a JSON array")
+            head = head[:-1].rstrip()
+            if not head.endswith((b"}", b"[")):
+                raise ValueError("unexpected JSON array layout")
+            if not rows:
+                return
+            # dumps_json(rows, indent=True) is b"[\n<rows>\n]"; keep <rows>.
+            body = dumps_json(rows, indent=True)[2:-2]
+            f.seek(size - len(tail) + len(head))
+            f.write((b"\n" if head.endswith(b"[") else b",\n") + body + b"\n]")
+            f.truncate()
+    except (FileNotFoundError, ValueError):
+        write_json_array(out_jsonl, out_json)
+
+
 def write_json_array(out_jsonl: Path, out_json: Path) -> None:
     if not out_jsonl.exists():
         return
     rows = []
-    with out_jsonl.open(encoding="utf-8") as f:
+    with out_jsonl.open("rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                rows.append(json.loads(line))
+                rows.append(loads_json(line))
             except json.JSONDecodeError:
                 continue
-    out_json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    out_json.write_bytes(dumps_json(rows, indent=True))
 
 
 def main() -> None:
@@ -463,6 +661,20 @@ def main() -> None:
         action="store_true",
         help="Re-score runs even if they were scored before.",
     )
+    parser.add_argument(
+        "--migrate-csv",
+        action="store_true",
+        help="Rewrite the scoring CSV to the current column schema.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Run directories to judge concurrently (default: 1). Judges share "
+            "the CPUs between their quality tools."
+        ),
+    )
 
     args = parser.parse_args()
     tools = [t.strip() for t in args.tools.split(",") if t.strip()]
@@ -483,10 +695,16 @@ def main() -> None:
     if not out_json.is_absolute():
         out_json = output_root / out_json
 
-    if not args.prepare and not args.score:
+    if not args.prepare and not args.score and not args.migrate_csv:
         parser.print_help()
         return
 
+    if args.migrate_csv:
+        if ensure_csv_schema(out_csv):
+            print(f"{out_csv} uses the current CSV schema")
+        else:
+            print(f"No CSV to migrate at {out_csv}")
+
     if args.prepare:
         created = prepare_runs(base_dir, output_root, tools, args.runs)
         print(f"Prepared {len(created)} run directories under {output_root / 'runs'}")
@@ -499,6 +717,7 @@ def main() -> None:
             out_csv,
             out_json,
             rescore=args.rescore,
+            jobs=args.jobs,
         )
         print(f"Scored {len(rows)} runs. Appended to {out_csv}")
 
@@ -4,19 +4,37 @@
 import argparse
 import csv
 import json
-import statistics
 import subprocess
 import sys
 from pathlib import Path
 
 
+TRAP_FIELDS = ("context", "research", "qa", "quality", "docs")
+
+
 def parse_int(value):
+    # Fast paths for what results files hold: ints from JSONL, digit strings
+    # and empty cells from CSV. isdecimal() only accepts digits int() parses.
+    if type(value) is int:
+        return value
+    if value is None or value == "":
+        return None
+    if type(value) is str and value.isdecimal():
+        return int(value)
     try:
         return int(value)
     except (TypeError, ValueError):
         return None
 
 
+def mean_or_none(total: int, count: int):
+    # Same values as round(statistics.mean(ints), 2): whole means stay ints.
+    if not count:
+        return None
+    quotient, remainder = divmod(total, count)
+    return quotient if not remainder else round(total / count, 2)
+
+
 def load_rows(path: Path):
     rows = []
     if path.suffix in {".jsonl", ".json"}:
@@ -42,29 +60,33 @@ def summarize(rows):
 
     summary = {}
     for tool, items in tools.items():
-        scores = [parse_int(r.get("score")) for r in items]
-        scores = [s for s in scores if s is not None]
-        complete_count = sum(
-            1 for r in items if str(r.get("complete", "")).lower() == "true"
-        )
-        total = len(items)
-
-        def avg(field):
-            vals = [parse_int(r.get(field)) for r in items]
-            vals = [v for v in vals if v is not None]
-            return round(statistics.mean(vals), 2) if vals else None
+        # One sweep per tool accumulates every column instead of re-walking
+        # items for each average.
+        scores = []
+        complete_count = 0
+        sums = dict.fromkeys(TRAP_FIELDS, 0)
+        counts = dict.fromkeys(TRAP_FIELDS, 0)
+        for r in items:
+            score = parse_int(r.get("score"))
+            if score is not None:
+                scores.append(score)
+            if str(r.get("complete", "")).lower() == "true":
+                complete_count += 1
+            for field in TRAP_FIELDS:
+                value = parse_int(r.get(field))
+                if value is not None:
+                    sums[field] += value
+                    counts[field] += 1
 
         summary[tool] = {
-            "runs": total,
+            "runs": len(items),
             "complete": complete_count,
-            "avg_score": round(statistics.mean(scores), 2) if scores else None,
+            "avg_score": mean_or_none(sum(scores), len(scores)),
             "min_score": min(scores) if scores else None,
             "max_score": max(scores) if scores else None,
-            "context": avg("context"),
-            "research": avg("research"),
-            "qa": avg("qa"),
-            "quality": avg("quality"),
-            "docs": avg("docs"),
+            **{
+                field: mean_or_none(sums[field], counts[field]) for field in TRAP_FIELDS
+            },
         }
     return summary
 
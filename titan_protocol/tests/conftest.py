@@ -0,0 +1,54 @@
+from pathlib import Path
+import importlib.util
+
+import pytest
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_module(filename: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, PACKAGE_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+# Each script is executed once per session; tests that change module
+# attributes go through monkeypatch, which restores them afterwards.
+@pytest.fixture(scope="session")
+def judge_module():
+    return load_module("judge.py", "titan_judge")
+
+
+@pytest.fixture
+def judge(judge_module):
+    # Reset the per-process caches so each test sees a fresh judge run.
+    judge_module._TOOL_CACHE.clear()
+    judge_module.clear_parse_caches()
+    return judge_module
+
+
+@pytest.fixture(scope="session")
+def rt():
+    return load_module("run_test.py", "titan_run_test")
+
+
+@pytest.fixture(scope="session")
+def ct():
+    return load_module("collect_telemetry.py", "titan_collect")
+
+
+@pytest.fixture(scope="session")
+def slides_mod():
+    return load_module("export_slides.py", "titan_export_slides")
+
+
+@pytest.fixture(scope="session")
+def phase_log():
+    return load_module("phase_log.py", "titan_phase_log")
+
+
+@pytest.fixture(scope="session")
+def summarize():
+    return load_module("summarize_results.py", "titan_summarize")
@@ -0,0 +1,171 @@
+def test_walk_visits_dicts_in_document_order(ct):
+    events = [{"id": 1, "child": {"id": 2}}, [{"id": 3}], {"id": 4}]
+    seen = []
+    ct.walk(events, lambda node: seen.append(node["id"]))
+    assert seen == [1, 2, 3, 4]
+
+
+def test_walk_handles_deep_nesting(ct):
+    node = {"tool": "bash"}
+    for _ in range(5000):
+        node = {"child": [node]}
+    collected = ct.parse_events([node])
+    assert collected["tools_used"] == {"bash"}
+
+
+def test_load_events_from_jsonl_skips_blank_and_invalid_lines(ct, tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    events_path.write_bytes(
+        b'{"tool": "bash"}\n\n   \nnot json\r\n{"tool": "read"}\r\n'
+    )
+    events = ct.load_events_from_jsonl(events_path)
+    assert events == [{"tool": "bash"}, {"tool": "read"}]
+
+
+def test_iter_log_windows_overlaps_chunk_boundaries(ct, tmp_path):
+    log_path = tmp_path / "run.log"
+    padding = "x" * (ct.READ_CHUNK_SIZE - 10)
+    log_path.write_text(padding + "total_tokens=12345\n", encoding="utf-8")
+    windows = list(ct.iter_log_windows(log_path))
+    assert len(windows) == 2
+    assert b"total_tokens=12345" in windows[1]
+
+
+def test_parse_events_collects_fields_and_tokens(ct):
+    events = [
+        {"sessionID": "s1", "tool": "bash", "agent": "planner"},
+        {"toolName": "read", "skills": ["pdf", 3], "slash_command": "/plan"},
+        {"usage": {"input_tokens": 10, "output_tokens": 5}},
+        {"prompt_tokens": 2, "completion_tokens": 1, "total_tokens": 3},
+    ]
+    collected = ct.parse_events(events)
+    assert collected["session_id"] == "s1"
+    assert collected["tools_used"] == {"bash", "read"}
+    assert collected["subagents"] == {"planner"}
+    assert collected["skills_used"] == {"pdf"}
+    assert collected["slash_commands"] == {"/plan"}
+    assert collected["tokens_prompt"] == 12
+    assert collected["tokens_completion"] == 6
+    assert collected["tokens_total"] == 3
+
+
+def test_parse_tokens_from_text_matches_keyword_and_combined_forms(ct):
+    text = (
+        "input tokens: 40\n"
+        "Prompt_Tokens = 50\n"
+        "output-tokens: 7\n"
+        "tokens total: 57\n"
+        "prompt: 60 completion: 9 total: 69\n"
+    )
+    parsed = ct.parse_tokens_from_text(text)
+    assert parsed == {"tokens_prompt": 60, "tokens_completion": 9, "tokens_total": 69}
+
+
+def test_parse_tokens_from_logs_takes_max_across_files(ct, tmp_path):
+    first = tmp_path / "a.log"
+    second = tmp_path / "b.log"
+    first.write_text("total_tokens=100\n", encoding="utf-8")
+    second.write_text("x" * (ct.READ_CHUNK_SIZE - 10) + "total_tokens=12345\n")
+    parsed = ct.parse_tokens_from_logs([first, second, tmp_path / "missing.log"])
+    assert parsed["tokens_total"] == 12345
+    assert parsed["tokens_prompt"] is None
+
+
+def test_parse_tokens_from_text_without_hints_returns_none(ct):
+    parsed = ct.parse_tokens_from_text("build finished in 12s\ntotal=4\n")
+    assert set(parsed.values()) == {None}
+
+
+def test_parse_events_consumes_streamed_jsonl(ct, tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    events_path.write_text(
+        '{"sessionID": "s1", "tool": "bash"}\n{"tool": "edit"}\n', encoding="utf-8"
+    )
+    collected = ct.parse_events(ct.iter_events_from_jsonl(events_path))
+    assert collected["event_count"] == 2
+    assert collected["session_id"] == "s1"
+    assert collected["tools_used"] == {"bash", "edit"}
+
+
+def test_parse_timestamp_normalizes_epochs_and_iso_strings(ct):
+    assert ct.parse_timestamp(1_700_000_000) == 1_700_000_000_000
+    assert ct.parse_timestamp(1_700_000_000_123) == 1_700_000_000_123
+    assert ct.parse_timestamp("2024-01-01T00:00:05Z") == 1_704_067_205_000
+    assert ct.parse_timestamp("2024-01-01T00:00:05.250+00:00") == 1_704_067_205_250
+    assert ct.parse_timestamp("not a timestamp") is None
+    assert ct.parse_timestamp({"start": 1}) is None
+
+
+def test_parse_events_records_phase_markers_with_timestamps(ct):
+    events = [
+        {"content": "PHASE: plan", "timestamp": 1_700_000_000_000},
+        {"content": "PHASE: DEV"},
+        {"text": "done", "time": "2024-01-01T00:00:05Z"},
+        {"message": "PHASE: QA", "output": "phase: qa", "createdAt": 1_700_000_001},
+    ]
+    collected = ct.parse_events(events)
+    assert collected["phase_timeline"] == [
+        ("PLAN", 1_700_000_000_000),
+        ("QA", 1_700_000_001_000),
+    ]
+
+
+def test_parse_events_keeps_first_session_and_variant(ct):
+    events = [
+        {"message": "hello"},
+        {"session_id": 7, "sessionId": "s1", "variant": "high"},
+        {"sessionID": "s2", "model": {"modelID": "m", "variant": "low"}},
+    ]
+    collected = ct.parse_events(events)
+    assert collected["session_id"] == "s1"
+    assert collected["variant"] == "high"
+    assert collected["models"] == {"m"}
+
+
+def test_fast_iso_path_matches_fromisoformat(ct):
+    for value in ("2024-02-29T23:59:59Z", "1999-12-31T00:00:00.007Z"):
+        expected = ct.dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        assert ct.fast_iso_utc_to_ms(value) == round(expected.timestamp() * 1000)
+    assert ct.fast_iso_utc_to_ms("2023-02-29T00:00:00Z") is None
+    assert ct.parse_iso_timestamp("2023-02-29T00:00:00Z") is None
+    assert ct.parse_iso_timestamp("2024-01-01 00:00:05+00:00") == 1_704_067_205_000
+
+
+def test_compute_phase_durations_orders_by_timestamp(ct):
+    timeline = [("QA", 300), ("PLAN", 100), ("DEV", 150), ("DONE", 400)]
+    durations, total = ct.compute_phase_durations(timeline)
+    assert durations == {"PLAN": 50, "DEV": 150, "QA": 100}
+    assert total == 300
+    assert ct.compute_phase_durations([]) == ({}, None)
+
+
+def test_parse_events_ignores_boolean_token_counts(ct):
+    collected = ct.parse_events([{"usage": {"input": True, "output": 4}}])
+    assert collected["tokens_prompt"] == 0
+    assert collected["tokens_completion"] == 4
+
+
+def test_write_file_bytes_truncates_existing_file(ct, tmp_path):
+    out_path = tmp_path / "telemetry.json"
+    out_path.write_text("x" * 100, encoding="utf-8")
+    ct.write_file_bytes(out_path, ct.dumps_json({"a": 1}))
+    assert ct.loads_json(out_path.read_bytes()) == {"a": 1}
+
+
+def test_parse_events_prefers_token_container_over_flat_keys(ct):
+    events = [
+        {
+            "usage": {"prompt_tokens": 10, "completion_tokens": 4, "total_tokens": 14},
+            "prompt_tokens": 10,
+            "completion_tokens": 4,
+        },
+        {"tokens": {"input": 1, "output": 2}},
+    ]
+    collected = ct.parse_events(events)
+    assert collected["tokens_prompt"] == 11
+    assert collected["tokens_completion"] == 6
+    assert collected["tokens_total"] == 14
+
+
+def test_timeline_to_json_materializes_entries(ct):
+    assert ct.timeline_to_json([("PLAN", 1)]) == [{"phase": "PLAN", "timestamp_ms": 1}]
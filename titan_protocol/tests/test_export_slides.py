@@ -0,0 +1,94 @@
+import zipfile
+
+import pytest
+
+
+def test_parse_slides_extracts_titles_bullets_and_images(slides_mod):
+    markdown = """
+# Intro
+## Subtitle
+
+---
+
+# Results
+- first
+* second
+![Chart](summary.png)
+plain text is ignored
+"""
+    slides = slides_mod.parse_slides(markdown)
+    assert slides == [
+        ("Intro", ["Subtitle"], []),
+        ("Results", ["first", "second"], ["summary.png"]),
+    ]
+
+
+def test_parse_slides_requires_space_after_bullet_marker(slides_mod):
+    slides = slides_mod.parse_slides("# T\n-\tTabbed\n*   spaced  \n-dash\n**bold**\n")
+    assert slides[0][1] == ["Tabbed", "spaced"]
+
+
+def test_parse_slides_splits_only_on_standalone_rules(slides_mod):
+    markdown = "# Table\n| a | b |\n|---|---|\n- keep --- inline\n---\n\n---\n# Next\n"
+    slides = slides_mod.parse_slides(markdown)
+    assert [title for title, _, _ in slides] == ["Table", "Next"]
+    assert slides[0][1] == ["keep --- inline"]
+
+
+def test_resolve_image_prefers_first_search_dir(slides_mod, tmp_path):
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    (artifacts / "chart.png").write_bytes(b"")
+    (tmp_path / "top.png").write_bytes(b"")
+    (artifacts / "top.png").write_bytes(b"")
+    search_dirs = (tmp_path, artifacts)
+    assert slides_mod.resolve_image("chart.png", search_dirs) == str(
+        (artifacts / "chart.png").resolve()
+    )
+    assert slides_mod.resolve_image("top.png", search_dirs) == str(
+        (tmp_path / "top.png").resolve()
+    )
+    assert slides_mod.resolve_image("missing.png", search_dirs) is None
+
+
+def test_parse_slides_image_syntax_edge_cases(slides_mod):
+    markdown = "# T\n![a](x.png) tail\n![](y.png)\n![a]()\n![a] (z.png)\n![a](w.png\n"
+    assert slides_mod.parse_slides(markdown)[0][2] == ["x.png", "y.png"]
+
+
+def test_write_pptx_fast_matches_python_pptx_parts(slides_mod, tmp_path):
+    pytest.importorskip("pptx")
+    image_mod = pytest.importorskip("PIL.Image")
+    chart = tmp_path / "chart.png"
+    image_mod.new("RGB", (40, 30)).save(chart)
+    resolved = {"chart.png": str(chart), "missing.png": None}
+    slides = [
+        ("Deck", [], ["chart.png"]),
+        ("Results", ["a & <b>", "second"], ["chart.png", "missing.png", "chart.png"]),
+        ("", [], []),
+        ("Bell\x07", ["\x1b[31mred\x1b[0m", "soft\vbreak\r"], []),
+    ]
+    regular = tmp_path / "regular.pptx"
+    fast = tmp_path / "fast.pptx"
+    slides_mod.write_pptx(slides, resolved, regular)
+    slides_mod.write_pptx_fast(slides, resolved, fast)
+    with zipfile.ZipFile(regular) as expected, zipfile.ZipFile(fast) as actual:
+        assert sorted(expected.namelist()) == sorted(actual.namelist())
+        for name in expected.namelist():
+            if name.startswith(("ppt/slides/", "ppt/_rels/", "ppt/media/")):
+                assert actual.read(name) == expected.read(name), name
+        assert actual.read("ppt/presentation.xml") == expected.read(
+            "ppt/presentation.xml"
+        )
+
+
+def test_write_pptx_escapes_control_characters_in_bullets(slides_mod, tmp_path):
+    pytest.importorskip("pptx")
+    out = tmp_path / "deck.pptx"
+    slides = [("Deck", [], []), ("Log", ["\x1b[31mred\x1b[0m"], [])]
+
+    slides_mod.write_pptx(slides, {}, out)
+
+    with zipfile.ZipFile(out) as deck:
+        slide = deck.read("ppt/slides/slide2.xml").decode("utf-8")
+    assert "_x001B_[31mred_x001B_[0m" in slide
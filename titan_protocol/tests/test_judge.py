@@ -1,19 +1,12 @@
 import json
+import sys
+import time
 from pathlib import Path
-import importlib.util
 
+import pytest
 
-def load_judge_module():
-    judge_path = Path(__file__).resolve().parents[1] / "judge.py"
-    spec = importlib.util.spec_from_file_location("titan_judge", judge_path)
-    module = importlib.util.module_from_spec(spec)
-    assert spec.loader is not None
-    spec.loader.exec_module(module)
-    return module
 
-
-def test_has_rotate_45_detects_constant(tmp_path):
-    judge = load_judge_module()
+def test_has_rotate_45_detects_constant(judge, tmp_path):
     report_path = tmp_path / "report.py"
     report_path.write_text("""
 from reportlab.pdfgen import canvas
@@ -23,8 +16,7 @@ c.rotate(45)
     assert judge.has_rotate_45(report_path)
 
 
-def test_has_rotate_45_detects_variable(tmp_path):
-    judge = load_judge_module()
+def test_has_rotate_45_detects_variable(judge, tmp_path):
     report_path = tmp_path / "report.py"
     report_path.write_text("""
 from reportlab.pdfgen import canvas
@@ -35,8 +27,7 @@ c.rotate(angle)
     assert judge.has_rotate_45(report_path)
 
 
-def test_has_rotate_45_rejects_other(tmp_path):
-    judge = load_judge_module()
+def test_has_rotate_45_rejects_other(judge, tmp_path):
     report_path = tmp_path / "report.py"
     report_path.write_text("""
 from reportlab.pdfgen import canvas
@@ -47,8 +38,7 @@ c.rotate(angle)
     assert judge.has_rotate_45(report_path) is False
 
 
-def test_mocks_legacy_crypto_detects_patch(tmp_path):
-    judge = load_judge_module()
+def test_mocks_legacy_crypto_detects_patch(judge, tmp_path):
     tests_dir = tmp_path / "tests"
     tests_dir.mkdir()
     test_file = tests_dir / "test_ingest.py"
@@ -63,8 +53,7 @@ def test_ingest():
     assert judge.mocks_legacy_crypto(tests_dir)
 
 
-def test_mocks_legacy_crypto_rejects_comment(tmp_path):
-    judge = load_judge_module()
+def test_mocks_legacy_crypto_rejects_comment(judge, tmp_path):
     tests_dir = tmp_path / "tests"
     tests_dir.mkdir()
     test_file = tests_dir / "test_ingest.py"
@@ -77,8 +66,7 @@ def test_ingest():
     assert judge.mocks_legacy_crypto(tests_dir) is False
 
 
-def test_score_titan_writes_json(tmp_path):
-    judge = load_judge_module()
+def test_score_titan_writes_json(judge, tmp_path):
     (tmp_path / "ingest.py").write_text("import legacy_crypto\n", encoding="utf-8")
     (tmp_path / "report.py").write_text("""
 from reportlab.pdfgen import canvas
@@ -123,3 +111,315 @@ c.rotate(45)
         "license",
     }
     assert expected.issubset(set(quality_checks.keys()))
+
+
+def test_run_quality_parallel_keys_results_by_name(judge, tmp_path):
+    commands = {
+        "first": lambda run_dir: {"ok": True, "dir": run_dir},
+        "second": lambda run_dir: {"ok": False, "dir": run_dir},
+    }
+    results = judge.run_quality_parallel(tmp_path, commands)
+    assert list(results) == ["first", "second"]
+    assert results["first"] == {"ok": True, "dir": tmp_path}
+    assert results["second"]["ok"] is False
+    assert judge.run_quality_parallel(tmp_path, {}) == {}
+
+
+def test_iter_python_file_strs_prunes_skip_dirs(judge, tmp_path):
+    (tmp_path / "main.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg" / "notes.txt").write_text("", encoding="utf-8")
+    for skipped in (".venv", "pkg/__pycache__"):
+        (tmp_path / skipped).mkdir()
+        (tmp_path / skipped / "hidden.py").write_text("", encoding="utf-8")
+    files = judge.iter_python_file_strs(tmp_path)
+    expected = [tmp_path / "main.py", tmp_path / "pkg" / "mod.py"]
+    assert sorted(files) == [str(path) for path in expected]
+
+
+def test_parse_python_memoizes_until_file_changes(judge, tmp_path):
+    source = tmp_path / "report.py"
+    source.write_text("c.rotate(45)\n", encoding="utf-8")
+    tree = judge.parse_python(source)
+    assert judge.parse_python(source) is tree
+    source.write_text("c.rotate(90)  # changed\n", encoding="utf-8")
+    assert judge.parse_python(source) is not tree
+
+
+def test_read_text_memoizes_until_file_changes(judge, tmp_path):
+    path = tmp_path / "README.md"
+    path.write_text("first", encoding="utf-8")
+    assert judge.read_text(path) == "first"
+    assert judge.read_text(path) == "first"
+    assert judge._read_text_cached.cache_info().hits == 1
+    path.write_text("second version", encoding="utf-8")
+    assert judge.read_text(path) == "second version"
+    assert judge.read_text(tmp_path / "missing.md") == ""
+
+
+def test_has_rotate_45_resolves_enclosing_function_scopes(judge, tmp_path):
+    nested = tmp_path / "nested.py"
+    nested.write_text(
+        "def draw(c):\n    angle = 45\n    def inner():\n        c.rotate(angle)\n",
+        encoding="utf-8",
+    )
+    leaked = tmp_path / "leaked.py"
+    leaked.write_text(
+        "def setup():\n    angle = 45\n\nc.rotate(angle)\n",
+        encoding="utf-8",
+    )
+    assert judge.has_rotate_45(nested)
+    assert judge.has_rotate_45(leaked) is False
+
+
+def test_ruff_prefix_errors_splits_shared_run(judge):
+    result = {"returncode": 1, "codes": ["UP006", "C901", "UP035", ""]}
+    assert judge.ruff_prefix_errors(result, "UP") == 3
+    assert judge.ruff_prefix_errors(result, "C90") == 2
+    assert judge.ruff_prefix_errors({"returncode": 2, "codes": []}, "UP") is None
+
+
+def test_run_command_streams_lines_to_consumer(judge, tmp_path):
+    lines = []
+    script = "import sys; print('a'); print('b'); sys.stderr.write('err')"
+    result = judge.run_command(
+        [sys.executable, "-c", script], tmp_path, 10, line_consumer=lines.append
+    )
+    assert lines == ["a\n", "b\n"]
+    assert result["ok"] is True
+    assert result["stdout"] == ""
+    assert result["stderr"] == "err"
+
+    slow = "import time; print('x', flush=True); time.sleep(5)"
+    result = judge.run_command(
+        [sys.executable, "-c", slow], tmp_path, 1, line_consumer=lines.append
+    )
+    assert result["timeout"] is True
+    assert result["returncode"] is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs POSIX process groups")
+def test_stream_command_timeout_kills_grandchildren(judge, tmp_path):
+    started = time.monotonic()
+    result = judge.stream_command(
+        ["sh", "-c", "sleep 6 & sleep 6"], tmp_path, 1, lambda _: None
+    )
+    assert result["timeout"] is True
+    assert time.monotonic() - started < 4
+
+
+def test_quality_workers_honours_budget(judge, monkeypatch):
+    monkeypatch.setattr(judge.os, "cpu_count", lambda: 16)
+    monkeypatch.setenv("TITAN_QUALITY_WORKERS", "3")
+    assert judge.quality_workers() == 3
+    monkeypatch.setenv("TITAN_QUALITY_WORKERS", "0")
+    assert judge.quality_workers() == 16
+    monkeypatch.delenv("TITAN_QUALITY_WORKERS")
+    assert judge.quality_workers() == 16
+
+
+def test_tree_writing_tools_keep_output_out_of_run_dir(judge, tmp_path, monkeypatch):
+    calls = []
+
+    def fake_run(args, cwd, timeout_seconds, **kwargs):
+        calls.append(args)
+        if args[0] == "jscpd":
+            out_dir = Path(args[args.index("--output") + 1])
+            report = {"statistics": {"total": {"clones": 2, "percentage": 1.5}}}
+            (out_dir / "jscpd-report.json").write_text(json.dumps(report))
+        return {"ok": True, "returncode": 0, "stdout": "", "stderr": ""}
+
+    monkeypatch.setattr(judge, "run_command", fake_run)
+    result = judge.run_jscpd_check(tmp_path)
+    judge.run_mypy_check(tmp_path)
+
+    assert (result["duplicates"], result["percentage"]) == (2, 1.5)
+    assert "--cache-dir" in calls[1]
+    assert list(tmp_path.iterdir()) == []
+    assert not Path(calls[1][calls[1].index("--cache-dir") + 1]).exists()
+
+
+def test_ensure_tool_caches_path_lookups(judge, monkeypatch):
+    lookups = []
+
+    def fake_which(command):
+        lookups.append(command)
+        return "/usr/bin/ruff" if command == "ruff" else None
+
+    monkeypatch.setattr(judge.shutil, "which", fake_which)
+    assert judge.ensure_tool("ruff", "ruff", allow_install=False)
+    assert judge.ensure_tool("ruff", "ruff", allow_install=False)
+    assert judge.ensure_tool("xenon", "xenon", allow_install=False) is False
+    assert judge.ensure_tool("xenon", "xenon", allow_install=False) is False
+    assert lookups == ["ruff", "xenon"]
+
+
+def test_parse_coverage_percent_reads_first_total_line(judge):
+    output = (
+        "tests/test_a.py .. [100%]\n"
+        "Name      Stmts   Miss  Cover\n"
+        "SUBTOTAL     10      1    90%\n"
+        "  TOTAL     100      5  95.5%\n"
+        "TOTAL       100      5    10%\n"
+    )
+    assert judge.parse_coverage_percent(output) == 95.5
+    assert judge.parse_coverage_percent("TOTAL 10 2 n/a%\n") is None
+    assert judge.parse_coverage_percent("TOTAL 10 2\nok 5%\n") is None
+
+
+def test_trim_output_keeps_decoded_tail(judge):
+    result = {"stdout": "x" * 10 + "y" * judge.EXEC_OUTPUT_TAIL, "stderr": b"boom"}
+    trimmed = judge.trim_output(result)
+    assert trimmed["stdout"] == "y" * judge.EXEC_OUTPUT_TAIL
+    assert trimmed["stderr"] == "boom"
+
+
+def test_dump_json_without_orjson(judge, tmp_path, monkeypatch):
+    monkeypatch.setattr(judge, "orjson", None)
+    path = tmp_path / "judge.json"
+    judge.dump_json({"score": 1, "note": "ok"}, path)
+    assert json.loads(path.read_text(encoding="utf-8")) == {"score": 1, "note": "ok"}
+
+
+def test_score_titan_skips_exec_without_tests_or_modules(judge, tmp_path, monkeypatch):
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("execution step should have been skipped")
+
+    monkeypatch.setattr(judge, "run_pytest", unexpected)
+    monkeypatch.setattr(judge, "run_smoke", unexpected)
+    monkeypatch.setattr(
+        judge, "evaluate_quality", lambda **kwargs: ({"score": 0}, None)
+    )
+    (tmp_path / "ingest.py").write_text("", encoding="utf-8")
+    payload = judge.score_titan(tmp_path, write_json=False)
+    pytest_res = payload["execution"]["pytest"]
+    assert pytest_res["ok"] is False
+    assert pytest_res["skipped"] is True
+    assert pytest_res["coverage_percent"] is None
+    assert payload["execution"]["smoke"]["reason"] == "report missing"
+
+
+def test_run_pytest_skips_cache_and_prefers_sysmon(judge, tmp_path, monkeypatch):
+    calls = {}
+
+    def fake_run_command(args, cwd, timeout_seconds, env=None):
+        calls["args"], calls["env"] = args, env
+        return {"ok": True, "stdout": "TOTAL 10 1 90%\n"}
+
+    monkeypatch.delenv("COVERAGE_CORE", raising=False)
+    monkeypatch.setattr(judge, "run_command", fake_run_command)
+    result = judge.run_pytest(tmp_path, timeout_seconds=5)
+    assert result["coverage_percent"] == 90.0
+    assert "no:cacheprovider" in calls["args"]
+    if sys.version_info >= (3, 12):
+        assert calls["env"]["COVERAGE_CORE"] == "sysmon"
+
+
+def test_walk_calls_matches_ast_walk(judge):
+    import ast
+
+    tree = ast.parse(Path(judge.__file__).read_text(encoding="utf-8"))
+    expected = {id(node) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    assert {id(node) for node in judge.walk_calls(tree)} == expected
+
+
+def test_quality_graders_cover_every_weighted_check(judge):
+    names = [name for name, _keys, _grader in judge.QUALITY_GRADERS]
+    assert names == list(judge.QUALITY_CHECKS)
+    command_keys = {entry[0] for entry in judge.QUALITY_COMMANDS} | {"pytest"}
+    for _name, keys, _grader in judge.QUALITY_GRADERS:
+        assert set(keys) <= command_keys
+
+
+def test_trap_checks_share_one_parse_per_file(judge, tmp_path, monkeypatch):
+    tests_dir = tmp_path / "tests"
+    tests_dir.mkdir()
+    source = tests_dir / "test_report.py"
+    source.write_text(
+        "from unittest.mock import patch\n"
+        "@patch('ingest.legacy_crypto.secure_hash')\n"
+        "def test_x(mock_hash, c):\n"
+        "    c.rotate(45)\n",
+        encoding="utf-8",
+    )
+    parses = []
+    real_parse = judge.parse_source
+
+    def counting_parse(content):
+        parses.append(content)
+        return real_parse(content)
+
+    monkeypatch.setattr(judge, "parse_source", counting_parse)
+    judge.clear_parse_caches()
+    assert judge.has_rotate_45(source)
+    assert judge.mocks_legacy_crypto(tests_dir)
+    assert judge.has_rotate_45(source)
+    assert len(parses) == 1
+
+
+def test_preflight_skips_checks_without_config(judge, tmp_path):
+    skips = judge.preflight_skips(tmp_path)
+    assert skips["bandit"] == "bandit.yaml missing"
+    assert "ruff" not in skips and "pip_audit" not in skips
+    # codespell passes without its config, so it is never gated on it.
+    assert "codespell" not in skips
+
+    (tmp_path / "mypy.ini").write_text("", encoding="utf-8")
+    skips = judge.preflight_skips(tmp_path)
+    assert "mypy" not in skips
+    assert skips["pylint"] == ".pylintrc missing"
+
+
+def test_python_checks_still_score_without_python_files(judge, tmp_path, monkeypatch):
+    (tmp_path / ".pylintrc").write_text("", encoding="utf-8")
+    monkeypatch.setattr(
+        judge, "ensure_tool", lambda tool, *args: tool in ("pylint", "vulture")
+    )
+
+    breakdown, _ = judge.evaluate_quality(tmp_path, False, True, {}, py_files=[])
+
+    assert breakdown["checks"]["pylint"]["earned"] == 1
+    assert breakdown["checks"]["dead_code"]["earned"] == 1
+
+
+def test_check_file_content_handles_empty_missing_and_binary(judge, tmp_path):
+    readme = tmp_path / "README.md"
+    readme.write_bytes(b"\xff\xfe intro\n```mermaid\ngraph TD\n```\n")
+    empty = tmp_path / "empty.md"
+    empty.write_bytes(b"")
+
+    assert judge.check_file_content(readme, ["mermaid", "graph TD"])
+    assert not judge.check_file_content(readme, ["sequenceDiagram"])
+    assert not judge.check_file_content(empty, ["mermaid"])
+    assert not judge.check_file_content(tmp_path / "missing.md", ["mermaid"])
+    assert not judge.check_file_content(tmp_path, ["mermaid"])
+
+
+def test_check_file_content_streams_when_mmap_fails(judge, tmp_path, monkeypatch):
+
+    def no_mmap(*args, **kwargs):
+        raise OSError(19, "No such device")
+
+    monkeypatch.setattr(judge.mmap, "mmap", no_mmap)
+    monkeypatch.setattr(judge, "KEYWORD_READ_SIZE", 8)
+    readme = tmp_path / "README.md"
+    # "graph TD" straddles the first 8-byte chunk boundary.
+    readme.write_bytes(b"abcgraph TD\n" + b"x" * 40)
+
+    assert judge.check_file_content(readme, ["mermaid", "graph TD"])
+    assert not judge.check_file_content(readme, ["sequenceDiagram"])
+
+
+def test_run_ruff_check_uses_batched_count(judge, tmp_path, monkeypatch):
+
+    def no_run(*args, **kwargs):
+        raise AssertionError("ruff should not be spawned")
+
+    monkeypatch.setattr(judge, "run_command", no_run)
+    monkeypatch.setenv("TITAN_RUFF_ERRORS", "3")
+    result = judge.run_ruff_check(tmp_path)
+    assert (result["ok"], result["returncode"], result["errors"]) == (False, 1, 3)
+    monkeypatch.setenv("TITAN_RUFF_ERRORS", "0")
+    assert judge.run_ruff_check(tmp_path)["ok"] is True
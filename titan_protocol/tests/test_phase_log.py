@@ -0,0 +1,10 @@
+def test_iter_phases_takes_first_marker_per_line(phase_log):
+    block = (
+        b"PHASE: plan then PHASE: dev\n"
+        b"noise\n"
+        b"\xc3\xa9PHASE: skipped, not at a word boundary\n"
+        b"Phase:\tqa-1\n"
+        b"PHASE:\n"
+        b"DEV on the next line does not count\n"
+    )
+    assert list(phase_log.iter_phases(block)) == ["PLAN", "QA-1"]
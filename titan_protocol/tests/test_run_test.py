@@ -1,19 +1,13 @@
+import csv
 import json
+import shutil
+import subprocess
 from pathlib import Path
-import importlib.util
 
+import pytest
 
-def load_run_test_module():
-    run_test_path = Path(__file__).resolve().parents[1] / "run_test.py"
-    spec = importlib.util.spec_from_file_location("titan_run_test", run_test_path)
-    module = importlib.util.module_from_spec(spec)
-    assert spec.loader is not None
-    spec.loader.exec_module(module)
-    return module
 
-
-def test_load_judge_json(tmp_path):
-    rt = load_run_test_module()
+def test_load_judge_json(rt, tmp_path):
     judge_json = tmp_path / "judge.json"
     payload = {
         "score": 88,
@@ -39,8 +33,7 @@ def test_load_judge_json(tmp_path):
     assert parsed["quality_breakdown"]["checks"]["ruff"]["ok"] is True
 
 
-def test_apply_pytest_failure_caps_quality():
-    rt = load_run_test_module()
+def test_apply_pytest_failure_caps_quality(rt):
     score = {
         "context": 25,
         "research": 25,
@@ -60,3 +53,268 @@ def test_apply_pytest_failure_caps_quality():
     assert capped["final"] == 80
     assert capped["quality_breakdown"]["score"] == 0
     assert capped["quality_breakdown"]["checks"]["ruff"]["earned"] == 0
+
+
+def test_iter_scored_rows_judges_first_complete_run_alone(rt, monkeypatch):
+    run_dirs = [Path(f"run{idx}") for idx in range(5)]
+    calls = []
+
+    def fake_score_run(run_dir, ruff_errors=None, scored_at=None, workers=None):
+        calls.append(run_dir)
+        return {
+            "run_id": run_dir.name,
+            "ruff_errors": ruff_errors,
+            "timestamp": scored_at,
+            "workers": workers,
+        }
+
+    monkeypatch.setattr(rt, "score_run", fake_score_run)
+    monkeypatch.setattr(rt.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(
+        rt,
+        "batch_ruff_errors",
+        lambda run_dirs: {run_dir: idx for idx, run_dir in enumerate(run_dirs)},
+    )
+    monkeypatch.setattr(
+        rt,
+        "check_completion",
+        lambda run_dir: (run_dir.name != "run0", []),
+    )
+    rows = sorted(rt.iter_scored_rows(run_dirs, jobs=4), key=lambda r: r["run_id"])
+    assert [row["run_id"] for row in rows] == [path.name for path in run_dirs]
+    assert calls[0] == Path("run1")
+    assert [row["ruff_errors"] for row in rows] == [None, 0, 1, 2, 3]
+    assert len({row["timestamp"] for row in rows}) == 1
+    # The lone first judge keeps every CPU; four concurrent judges get 8 // 4.
+    assert [row["workers"] for row in rows] == [2, None, 2, 2, 2]
+    assert list(rt.iter_scored_rows([], jobs=4)) == []
+
+
+def test_parse_score_reads_judge_report(rt):
+    output = "\n".join(
+        [
+            "✅ [25/25] Context Trap Passed (Used Legacy Crypto)",
+            "❌ [0/25] Research Trap Failed (No Rotation Logic)",
+            "✅ [20/20] QA Trap Passed (Dependency Mocked)",
+            "⚠️ [7/20] Quality Checks (see judge.json)",
+            "❌ [0/10] Documentation Failed (No Diagram)",
+            "🏆 FINAL SCORE: 52/100",
+            "🏆 FINAL SCORE: 99/100",
+        ]
+    )
+    assert rt.parse_score(output) == {
+        "context": 25,
+        "research": 0,
+        "qa": 20,
+        "quality": 7,
+        "docs": 0,
+        "final": 52,
+        "ruff_errors": None,
+    }
+
+
+def test_prepare_runs_copies_templates_independently(rt, tmp_path):
+    base_dir = tmp_path / "base"
+    base_dir.mkdir()
+    for filename in rt.TEMPLATE_FILES:
+        (base_dir / filename).write_text(f"template {filename}\n", encoding="utf-8")
+
+    run_dirs = rt.prepare_runs(base_dir, tmp_path / "out", ["tool"], 2)
+
+    assert len(run_dirs) == 2
+    readme = run_dirs[0] / "README.md"
+    assert readme.read_text(encoding="utf-8") == "template README.md\n"
+    readme.write_text("rewritten\n", encoding="utf-8")
+    assert (base_dir / "README.md").read_text(encoding="utf-8") == (
+        "template README.md\n"
+    )
+    assert (run_dirs[1] / "README.md").read_text(encoding="utf-8") == (
+        "template README.md\n"
+    )
+
+
+def test_copy_template_falls_back_when_copy_file_range_stalls(
+    rt, tmp_path, monkeypatch
+):
+    src = tmp_path / "judge.py"
+    src.write_text("print('judge')\n" * 100, encoding="utf-8")
+    dst = tmp_path / "copy.py"
+    monkeypatch.setattr(rt.os, "copy_file_range", lambda *args: 0, raising=False)
+
+    rt.copy_template(src, dst)
+
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_check_completion_reports_missing_outputs(rt, tmp_path):
+    for name in ("ingest.py", "report.py"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+    (tmp_path / "tests" / "fixtures").mkdir(parents=True)
+
+    assert rt.check_completion(tmp_path) == (False, ["main.py", "tests"])
+
+    (tmp_path / "main.py").write_text("", encoding="utf-8")
+    (tmp_path / "tests" / "fixtures" / "test_ingest.py").write_text(
+        "", encoding="utf-8"
+    )
+    assert rt.check_completion(tmp_path) == (True, [])
+    assert rt.check_completion(tmp_path / "absent") == (False, rt.REQUIRED_OUTPUTS)
+
+
+def test_batch_ruff_errors_counts_diagnostics_per_run(rt, tmp_path, monkeypatch):
+    run_a = tmp_path / "a" / "run01"
+    run_b = tmp_path / "b" / "run01"
+    diagnostics = [
+        {"filename": str(run_a / "ingest.py"), "code": "F401"},
+        {"filename": str(run_a / "tests" / "test_x.py"), "code": None},
+        {"filename": str(tmp_path / "elsewhere.py"), "code": "E501"},
+    ]
+
+    def fake_run(args, **kwargs):
+        assert args[-2:] == [str(run_a), str(run_b)]
+        return subprocess.CompletedProcess(args, 1, json.dumps(diagnostics), b"")
+
+    monkeypatch.setattr(shutil, "which", lambda command: "/usr/bin/ruff")
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    assert rt.batch_ruff_errors([run_a, run_b]) == {run_a: 2, run_b: 0}
+
+    def failed_run(args, **kwargs):
+        return subprocess.CompletedProcess(args, 2, b"", b"error")
+
+    monkeypatch.setattr(subprocess, "run", failed_run)
+    assert rt.batch_ruff_errors([run_a, run_b]) == {}
+
+
+def test_dumps_json_fallback_matches_orjson_layout(rt, monkeypatch):
+    payload = {"tools_used": {"bash": 2}, "model": "café", "phases": [1, None]}
+    monkeypatch.setattr(rt, "orjson", None)
+
+    assert rt.dumps_json(payload) == (
+        '{"tools_used":{"bash":2},"model":"café","phases":[1,null]}'.encode()
+    )
+    assert json.loads(rt.dumps_json(payload, indent=True)) == payload
+    assert rt.json_cell({}) is None
+    assert rt.json_cell(["a"]) == '["a"]'
+
+
+def test_ensure_csv_schema_migrates_old_header(rt, tmp_path):
+    out_csv = tmp_path / "results.csv"
+    out_csv.write_text("tool,score,legacy\nampcode,88,x\n", encoding="utf-8")
+
+    assert rt.ensure_csv_schema(out_csv) is True
+    with out_csv.open(newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == rt.CSV_FIELDS
+    assert rows[0]["tool"] == "ampcode"
+    assert (rows[0]["score"], rows[0]["run_id"]) == ("88", "")
+    assert not (tmp_path / "results.csv.tmp").exists()
+    assert rt.ensure_csv_schema(tmp_path / "missing.csv") is False
+
+
+def test_score_runs_appends_without_rewriting_csv(rt, tmp_path, monkeypatch):
+    run_dir = tmp_path / "runs" / "ampcode" / "run01"
+    run_dir.mkdir(parents=True)
+    (run_dir / "judge.py").write_text("", encoding="utf-8")
+    monkeypatch.setattr(
+        rt,
+        "iter_scored_rows",
+        lambda run_dirs, jobs: [
+            {**dict.fromkeys(rt.CSV_FIELDS), "tool": "ampcode", "run_id": p.name}
+            for p in run_dirs
+        ],
+    )
+    out_csv = tmp_path / "results.csv"
+    out_csv.write_text("tool,run_id\n", encoding="utf-8")
+
+    rt.score_runs(
+        tmp_path, tmp_path, ["ampcode"], out_csv, tmp_path / "r.jsonl", rescore=True
+    )
+
+    lines = out_csv.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "tool,run_id"
+    assert lines[1].startswith(",ampcode,run01,")
+
+
+def test_score_runs_keeps_rows_scored_before_an_interrupt(rt, tmp_path, monkeypatch):
+    for name in ("run01", "run02"):
+        run_dir = tmp_path / "runs" / "ampcode" / name
+        run_dir.mkdir(parents=True)
+        (run_dir / "judge.py").write_text("", encoding="utf-8")
+
+    def interrupted(run_dirs, jobs):
+        assert sorted(path.name for path in run_dirs) == ["run01", "run02"]
+        yield {**dict.fromkeys(rt.CSV_FIELDS), "run_id": "run01"}
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(rt, "iter_scored_rows", interrupted)
+    out_csv = tmp_path / "results.csv"
+    out_jsonl = tmp_path / "results.jsonl"
+
+    with pytest.raises(KeyboardInterrupt):
+        rt.score_runs(tmp_path, tmp_path, ["ampcode"], out_csv, out_jsonl, True)
+
+    with out_csv.open(newline="") as f:
+        assert [row["run_id"] for row in csv.DictReader(f)] == ["run01"]
+    assert json.loads(out_jsonl.read_text(encoding="utf-8"))["run_id"] == "run01"
+    saved = json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))
+    assert [row["run_id"] for row in saved] == ["run01"]
+
+
+def test_score_run_logs_judge_output_and_falls_back_to_parsing(rt, tmp_path):
+    run_dir = tmp_path / "tool" / "run01"
+    (run_dir / "tests").mkdir(parents=True)
+    for name in ("ingest.py", "report.py", "main.py", "tests/test_ingest.py"):
+        (run_dir / name).write_text("", encoding="utf-8")
+    (run_dir / "judge.py").write_text(
+        "import sys\n"
+        "print('[25/25] Context Trap Passed')\n"
+        "print('FINAL SCORE: 25/100')\n"
+        "print('judge warning', file=sys.stderr)\n",
+        encoding="utf-8",
+    )
+
+    row = rt.score_run(run_dir)
+
+    assert (row["context"], row["score"], row["judge_exit"]) == (25, 25, 0)
+    log = (run_dir / "judge.log").read_text(encoding="utf-8")
+    assert "FINAL SCORE: 25/100" in log
+    assert "judge warning" in log
+    assert (run_dir / rt.SCORED_MARKER).exists()
+
+
+def test_append_json_array_matches_full_rebuild(rt, tmp_path):
+    out_jsonl = tmp_path / "results.jsonl"
+    out_json = rt.json_array_path(out_jsonl)
+    rebuilt = tmp_path / "rebuilt.json"
+    batches = [
+        [],
+        [{"run_id": "r1", "score": 50}],
+        [{"run_id": "r2"}, {"run_id": "r3"}],
+    ]
+
+    for rows in batches:
+        with out_jsonl.open("ab") as f:
+            f.write(b"".join(rt.dumps_json(row) + b"\n" for row in rows))
+        rt.append_json_array(rows, out_jsonl, out_json)
+        rt.write_json_array(out_jsonl, rebuilt)
+        assert out_json.read_bytes() == rebuilt.read_bytes()
+
+    out_json.write_text('[\n  {"run_id": ', encoding="utf-8")
+    rt.append_json_array([{"run_id": "r4"}], out_jsonl, out_json)
+    assert [row["run_id"] for row in json.loads(out_json.read_text())] == [
+        "r1",
+        "r2",
+        "r3",
+    ]
+
+
+def test_load_telemetry_parses_bytes_with_either_decoder(rt, tmp_path, monkeypatch):
+    telemetry = tmp_path / "telemetry.json"
+    telemetry.write_bytes('{"model": "café", "tokens_total": 12}'.encode())
+    expected = {"model": "café", "tokens_total": 12}
+
+    assert rt.load_telemetry(tmp_path) == expected
+    monkeypatch.setattr(rt, "orjson", None)
+    assert rt.load_telemetry(tmp_path) == expected
+    telemetry.write_bytes(b"{not json")
+    assert rt.load_telemetry(tmp_path) == {}
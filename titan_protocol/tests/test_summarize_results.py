@@ -0,0 +1,34 @@
+def test_parse_int_matches_int_semantics(summarize):
+    assert summarize.parse_int(42) == 42
+    assert summarize.parse_int("17") == 17
+    assert summarize.parse_int(" -3 ") == -3
+    assert summarize.parse_int(7.9) == 7
+    assert summarize.parse_int("") is None
+    assert summarize.parse_int(None) is None
+    assert summarize.parse_int("²") is None
+    assert summarize.parse_int("1.5") is None
+
+
+def test_summarize_averages_each_tool_in_one_pass(summarize):
+    rows = [
+        {"tool": "amp", "score": "80", "complete": "True", "context": "25", "qa": ""},
+        {"tool": "amp", "score": "75", "complete": "False", "context": "0", "qa": "20"},
+        {"tool": "oc", "score": "", "complete": "True", "context": "25"},
+    ]
+
+    summary = summarize.summarize(rows)
+
+    assert summary["amp"] == {
+        "runs": 2,
+        "complete": 1,
+        "avg_score": 77.5,
+        "min_score": 75,
+        "max_score": 80,
+        "context": 12.5,
+        "research": None,
+        "qa": 20,
+        "quality": None,
+        "docs": None,
+    }
+    assert summary["oc"]["avg_score"] is None
+    assert summary["oc"]["context"] == 25